@@ -2,9 +2,10 @@
 Main Telegram Shop Bot implementation.
 """
 import asyncio
+import itertools
 import json
-import uuid
-from datetime import datetime, timezone
+import time
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any
 
 from telegram import (
@@ -16,57 +17,338 @@ from telegram.ext import (
     ConversationHandler, filters, ContextTypes
 )
 from telegram.constants import ParseMode
+from redis import asyncio as aioredis
+from sqlalchemy import select, update
 from loguru import logger
 
 from config.settings import get_settings
-from database.database import SessionLocal, get_db
+from database.database import AsyncSessionLocal
 from database.models import (
     User, Product, Category, Order, OrderItem, Payment,
     UserRole, OrderStatus, PaymentStatus, ProductType
 )
+from services.analytics import sales_view_refresh_loop
 from services.nowpayments import nowpayments_service
 from services.qr_generator import qr_generator
+from .persistence import RedisPersistence
 from .keyboards import (
     main_menu_keyboard, category_keyboard, product_keyboard,
-    cart_keyboard, payment_keyboard, order_history_keyboard
+    cart_keyboard, payment_keyboard, order_history_keyboard,
+    apply_menu_usage, preload_keyboard_translations, warm_static_keyboards
 )
 from .utils import (
     get_or_create_user, format_product_message, format_order_message,
-    calculate_order_total, get_user_language, translate_text
+    calculate_order_total, get_user_language, translate_text, escape_html,
+    activity_flush_loop, flush_pending_activity
 )
 
 settings = get_settings()
 
+# Fallback order-number sequence, used only when Redis is unreachable.
+# Seeded from the millisecond clock so a degraded process still avoids
+# reusing its own values; the shared counter lives in Redis (see
+# _next_order_sequence) so numbers stay unique across workers too.
+_order_sequence = itertools.count(time.time_ns() // 1_000_000)
+
+# How often accumulated product view counts are flushed to the database
+VIEW_COUNT_FLUSH_INTERVAL = 10  # seconds
+
+# TTL for cached category/product listings (read-mostly catalog rows)
+CATALOG_CACHE_TTL = 120  # seconds
+
+# How often main-menu row ordering is refreshed from observed click counts
+MENU_USAGE_REFRESH_INTERVAL = 3600  # seconds
+
+# ConversationHandler.END resolved once at import time; conversation
+# callbacks return the bound constant instead of re-resolving the
+# attribute on every transition
+_END = ConversationHandler.END
+
 # Conversation states
-(SELECTING_CATEGORY, SELECTING_PRODUCT, VIEWING_PRODUCT, 
+(SELECTING_CATEGORY, SELECTING_PRODUCT, VIEWING_PRODUCT,
  ADDING_TO_CART, CHECKOUT, PAYMENT_METHOD, PAYMENT_CONFIRMATION,
  SUPPORT_MESSAGE, SUPPORT_CATEGORY) = range(9)
 
+# Static message templates, pre-rendered per language at startup
+WELCOME_TEMPLATE = (
+    "Welcome to our crypto shop! 🛍️\n\n"
+    "You can browse our products, make purchases with cryptocurrency, "
+    "and track your orders all from this bot.\n\n"
+    "Use /menu to see available options or click the button below."
+)
+
+MENU_TEMPLATE = "🛍️ <b>Main Menu</b>\n\nWhat would you like to do?"
+
+HELP_TEMPLATE = (
+    "🤖 <b>Shop Bot Help</b>\n\n"
+    "<b>Commands:</b>\n"
+    "/start - Start the bot and see welcome message\n"
+    "/menu - Show main menu\n"
+    "/cart - View your shopping cart\n"
+    "/orders - View your order history\n"
+    "/support - Contact customer support\n"
+    "/language - Change language\n"
+    "/profile - View your profile\n\n"
+    "<b>How to shop:</b>\n"
+    "1. Browse categories and products\n"
+    "2. Add items to your cart\n"
+    "3. Proceed to checkout\n"
+    "4. Pay with cryptocurrency\n"
+    "5. Receive your digital products instantly\n\n"
+    "<b>Payment:</b>\n"
+    "We accept various cryptocurrencies including Bitcoin, Ethereum, "
+    "and many others. All payments are processed securely.\n\n"
+    "<b>Support:</b>\n"
+    "Need help? Use /support to contact our customer service team."
+)
+
 
 class TelegramShopBot:
     """Main Telegram shop bot class."""
     
     def __init__(self):
         self.application = None
-        self.user_carts = {}  # In-memory cart storage (use Redis in production)
-        self.user_states = {}  # User conversation states
-        
+        self.redis = None  # Redis-backed cart storage (shared across workers)
+        self._static_texts = {}  # {language: {name: rendered message}}
+        self._pending_view_counts = {}  # {product_id: views since last flush}
+        self._user_memo = {}  # {update_id: User} — per-update cache, never persisted
+        self._view_flush_task = None
+        self._menu_usage_task = None
+        self._activity_flush_task = None
+        self._sales_view_task = None
+        self._payment_refresh_task = None
+
     async def initialize(self):
         """Initialize the bot application."""
         try:
-            # Create application
-            self.application = Application.builder().token(
-                settings.telegram_bot_token
-            ).build()
-            
+            # Create application with Redis-backed persistence so
+            # conversation state survives restarts and is shared
+            # between workers
+            self.application = (
+                Application.builder()
+                .token(settings.telegram_bot_token)
+                .persistence(RedisPersistence(url=settings.redis_url))
+                .build()
+            )
+
+            # Connect Redis for cart storage
+            self.redis = aioredis.from_url(
+                settings.redis_url,
+                decode_responses=True
+            )
+
             # Add handlers
             self._add_handlers()
-            
+
+            # Pre-render static messages and warm the keyboard label cache
+            # once per supported language so command handlers never
+            # translate on the request path
+            await self._render_static_texts()
+            await preload_keyboard_translations()
+            await self._apply_menu_usage()
+            warm_static_keyboards()
+
+            # Flush accumulated view counts in the background
+            self._view_flush_task = asyncio.create_task(self._flush_view_counts_loop())
+
+            # Periodically re-sort menu rows from accumulated click counts
+            self._menu_usage_task = asyncio.create_task(self._refresh_menu_usage_loop())
+
+            # Batch queued activity-log events into bulk inserts
+            self._activity_flush_task = asyncio.create_task(activity_flush_loop())
+
+            # Keep the sales_by_category reporting view fresh
+            self._sales_view_task = asyncio.create_task(sales_view_refresh_loop())
+
+            # Pre-warm the NOWPayments currency list so the first checkout
+            # doesn't pay the external HTTP round-trip
+            asyncio.create_task(nowpayments_service.get_available_currencies())
+
+            # Safety net for missed IPNs: bulk-refresh pending payment
+            # statuses every few minutes
+            self._payment_refresh_task = asyncio.create_task(
+                nowpayments_service.pending_refresh_loop()
+            )
+
             logger.info("Telegram bot initialized successfully")
-            
+
         except Exception as e:
             logger.error(f"Failed to initialize Telegram bot: {e}")
             raise
+
+    async def _get_telegram_user(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """
+        Resolve the database user once per update.
+
+        The resolved row is memoized in an in-process dict keyed by the
+        current update id, so multi-step chains (callback dispatch ->
+        checkout -> payment) share one lookup instead of re-querying.
+        Kept out of context.user_data on purpose: that dict is pickled
+        to Redis by the persistence layer, and a memo for an already
+        processed update would just be dead weight there.
+        """
+        memo = self._user_memo.get(update.update_id)
+        if memo is not None:
+            return memo
+
+        telegram_user = await get_or_create_user(update.effective_user)
+        # Updates are processed in arrival order, so evicting the oldest
+        # entries keeps the dict tiny without dropping live memos
+        while len(self._user_memo) >= 64:
+            self._user_memo.pop(next(iter(self._user_memo)))
+        self._user_memo[update.update_id] = telegram_user
+        return telegram_user
+
+    async def get_category_cached(self, category_id: int) -> Optional[Dict[str, Any]]:
+        """Fetch a category via Redis (short TTL), falling back to the DB."""
+        cache_key = f"cat:{category_id}"
+        cached = await self.redis.get(cache_key)
+        if cached:
+            return json.loads(cached)
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Category).where(Category.id == category_id)
+            )
+            category = result.scalar_one_or_none()
+
+        if not category:
+            return None
+
+        # Escape once at cache-fill time so every render of the cached
+        # entry can interpolate straight into HTML messages
+        data = {
+            "id": category.id,
+            "name": category.name,
+            "name_html": escape_html(category.name),
+            "description_html": escape_html(category.description or "")
+        }
+        await self.redis.setex(cache_key, CATALOG_CACHE_TTL, json.dumps(data))
+        return data
+
+    async def list_active_products_cached(self, category_id: int) -> List[Dict[str, Any]]:
+        """Fetch a category's active products via Redis (short TTL)."""
+        cache_key = f"cat:{category_id}:products"
+        cached = await self.redis.get(cache_key)
+        if cached:
+            return json.loads(cached)
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Product).where(
+                    Product.category_id == category_id,
+                    Product.is_active == True
+                )
+            )
+            products = [
+                {"id": product.id, "name": product.name, "price": product.price}
+                for product in result.scalars()
+            ]
+
+        await self.redis.setex(cache_key, CATALOG_CACHE_TTL, json.dumps(products))
+        return products
+
+    async def invalidate_catalog_cache(self, category_id: int):
+        """Drop cached catalog entries (call after admin product/category edits)."""
+        await self.redis.delete(f"cat:{category_id}", f"cat:{category_id}:products")
+
+    def record_product_view(self, product_id: int):
+        """Count a product view; counts are written to the DB in batches."""
+        self._pending_view_counts[product_id] = (
+            self._pending_view_counts.get(product_id, 0) + 1
+        )
+
+    async def _next_order_sequence(self, date_str: str) -> int:
+        """
+        Next order-number sequence value for the given day.
+
+        A per-day Redis INCR keeps the counter shared across workers and
+        restarts; the in-process clock-seeded counter only backs it up
+        when Redis is unreachable.
+        """
+        try:
+            key = f"ord:{date_str}"
+            seq = await self.redis.incr(key)
+            if seq == 1:
+                # Expire the counter once the date can no longer appear
+                # in a new order number
+                await self.redis.expire(key, 172800)
+            return seq
+        except Exception as e:
+            logger.error(f"Redis order sequence unavailable, using local counter: {e}")
+            return next(_order_sequence)
+
+    async def _apply_menu_usage(self):
+        """Reorder main-menu rows from click counts accumulated in Redis."""
+        try:
+            counts = await self.redis.hgetall("stats:callback_counts")
+            if counts:
+                apply_menu_usage({data: int(n) for data, n in counts.items()})
+        except Exception as e:
+            logger.error(f"Failed to apply menu usage stats: {e}")
+
+    async def _refresh_menu_usage_loop(self):
+        """Periodically refresh menu row ordering from usage stats."""
+        while True:
+            await asyncio.sleep(MENU_USAGE_REFRESH_INTERVAL)
+            await self._apply_menu_usage()
+
+    async def _flush_view_counts_loop(self):
+        """Periodically flush accumulated product view counts."""
+        while True:
+            await asyncio.sleep(VIEW_COUNT_FLUSH_INTERVAL)
+            await self._flush_view_counts()
+
+    async def _flush_view_counts(self):
+        """Write pending view-count increments in a single transaction."""
+        if not self._pending_view_counts:
+            return
+
+        pending, self._pending_view_counts = self._pending_view_counts, {}
+        try:
+            async with AsyncSessionLocal() as db:
+                for product_id, count in pending.items():
+                    await db.execute(
+                        update(Product)
+                        .where(Product.id == product_id)
+                        .values(view_count=Product.view_count + count)
+                    )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to flush view counts: {e}")
+
+    async def _render_static_texts(self):
+        """Pre-render welcome/menu/help messages for each language."""
+        for language in settings.supported_languages:
+            self._static_texts[language] = {
+                "welcome": await translate_text(WELCOME_TEMPLATE, language),
+                "menu": await translate_text(MENU_TEMPLATE, language),
+                "help": await translate_text(HELP_TEMPLATE, language),
+            }
+
+    def _static_text(self, name: str, language: str) -> str:
+        """Look up a pre-rendered message, falling back to the default language."""
+        texts = self._static_texts.get(language) or self._static_texts.get(
+            settings.default_language, {}
+        )
+        return texts.get(name, "")
+
+    def _cart_key(self, telegram_id) -> str:
+        """Build the Redis hash key for a user's cart."""
+        return f"cart:{telegram_id}"
+
+    async def get_cart(self, telegram_id) -> Dict[int, int]:
+        """Get a user's cart as a product_id -> quantity map."""
+        cart = await self.redis.hgetall(self._cart_key(telegram_id))
+        return {int(product_id): int(quantity) for product_id, quantity in cart.items()}
+
+    async def add_to_cart(self, telegram_id, product_id: int, quantity: int = 1):
+        """Add quantity of a product to a user's cart."""
+        await self.redis.hincrby(self._cart_key(telegram_id), product_id, quantity)
+
+    async def clear_cart(self, telegram_id):
+        """Remove a user's cart entirely."""
+        await self.redis.delete(self._cart_key(telegram_id))
     
     async def start(self):
         """Start the bot."""
@@ -78,15 +360,31 @@ class TelegramShopBot:
             await self.application.initialize()
             await self.application.start()
             
-            # Set webhook if configured
-            if settings.webhook_url:
-                webhook_url = f"{settings.webhook_url}/webhook"
-                await self.application.bot.set_webhook(webhook_url)
-                logger.info(f"Webhook set to: {webhook_url}")
+            # Webhook mode is the default; polling is opt-in for local dev
+            if settings.use_polling or not settings.webhook_url:
+                # Real long-poll: a 30s timeout keeps the connection open
+                # instead of devolving into a tight request loop, and the
+                # explicit allowed_updates lets Telegram drop update types
+                # we never handle
+                await self.application.updater.start_polling(
+                    poll_interval=0.0,
+                    timeout=30,
+                    bootstrap_retries=-1,
+                    allowed_updates=Update.ALL_TYPES
+                )
+                logger.info("Bot started with polling (development mode)")
             else:
-                # Start polling
-                await self.application.updater.start_polling()
-                logger.info("Bot started with polling")
+                url_path = settings.webhook_path.lstrip("/")
+                webhook_url = f"{settings.webhook_url.rstrip('/')}/{url_path}"
+                await self.application.updater.start_webhook(
+                    listen=settings.webhook_listen,
+                    port=settings.webhook_port,
+                    url_path=url_path,
+                    webhook_url=webhook_url
+                )
+                logger.info(f"Webhook receiver listening on "
+                            f"{settings.webhook_listen}:{settings.webhook_port}, "
+                            f"webhook set to: {webhook_url}")
             
         except Exception as e:
             logger.error(f"Failed to start Telegram bot: {e}")
@@ -95,47 +393,34 @@ class TelegramShopBot:
     async def stop(self):
         """Stop the bot."""
         try:
+            if self._view_flush_task:
+                self._view_flush_task.cancel()
+                await self._flush_view_counts()
+            if self._menu_usage_task:
+                self._menu_usage_task.cancel()
+            if self._activity_flush_task:
+                self._activity_flush_task.cancel()
+                flush_pending_activity()
+            if self._sales_view_task:
+                self._sales_view_task.cancel()
+            if self._payment_refresh_task:
+                self._payment_refresh_task.cancel()
             if self.application:
                 await self.application.stop()
                 await self.application.shutdown()
                 logger.info("Telegram bot stopped")
+            await nowpayments_service.aclose()
+            if self.redis:
+                await self.redis.aclose()
         except Exception as e:
             logger.error(f"Error stopping bot: {e}")
     
     def _add_handlers(self):
         """Add all command and message handlers."""
         
-        # Command handlers
-        self.application.add_handler(CommandHandler("start", self.start_command))
-        self.application.add_handler(CommandHandler("help", self.help_command))
-        self.application.add_handler(CommandHandler("menu", self.menu_command))
-        self.application.add_handler(CommandHandler("cart", self.cart_command))
-        self.application.add_handler(CommandHandler("orders", self.orders_command))
-        self.application.add_handler(CommandHandler("support", self.support_command))
-        self.application.add_handler(CommandHandler("language", self.language_command))
-        self.application.add_handler(CommandHandler("profile", self.profile_command))
-        
-        # Callback query handlers
-        self.application.add_handler(CallbackQueryHandler(
-            self.handle_category_selection, pattern="^category_"
-        ))
-        self.application.add_handler(CallbackQueryHandler(
-            self.handle_product_selection, pattern="^product_"
-        ))
-        self.application.add_handler(CallbackQueryHandler(
-            self.handle_cart_action, pattern="^cart_"
-        ))
-        self.application.add_handler(CallbackQueryHandler(
-            self.handle_payment_action, pattern="^payment_"
-        ))
-        self.application.add_handler(CallbackQueryHandler(
-            self.handle_order_action, pattern="^order_"
-        ))
-        self.application.add_handler(CallbackQueryHandler(
-            self.handle_support_action, pattern="^support_"
-        ))
-        
-        # Conversation handler for support
+        # Conversation handler for support (registered before the generic
+        # dispatchers so its entry points and /cancel fallback take
+        # precedence)
         support_conv = ConversationHandler(
             entry_points=[CallbackQueryHandler(
                 self.start_support, pattern="^support_new$"
@@ -149,9 +434,40 @@ class TelegramShopBot:
                 )],
             },
             fallbacks=[CommandHandler("cancel", self.cancel_support)],
+            name="support_conversation",
+            persistent=True,
         )
         self.application.add_handler(support_conv)
-        
+
+        # Single command dispatcher: one handler and one dict lookup per
+        # command update instead of a CommandHandler check per command
+        self._command_routes = {
+            "start": self.start_command,
+            "help": self.help_command,
+            "menu": self.menu_command,
+            "cart": self.cart_command,
+            "orders": self.orders_command,
+            "support": self.support_command,
+            "language": self.language_command,
+            "profile": self.profile_command,
+        }
+        self.application.add_handler(MessageHandler(
+            filters.COMMAND, self.handle_command
+        ))
+
+        # Single callback dispatcher: one O(1) prefix lookup per update
+        # instead of a regex match for every registered handler
+        self._callback_routes = {
+            "categories": self.handle_categories_page,
+            "category": self.handle_category_selection,
+            "product": self.handle_product_selection,
+            "cart": self.handle_cart_action,
+            "payment": self.handle_payment_action,
+            "order": self.handle_order_action,
+            "support": self.handle_support_action,
+        }
+        self.application.add_handler(CallbackQueryHandler(self.handle_callback_query))
+
         # Message handlers
         self.application.add_handler(MessageHandler(
             filters.TEXT & ~filters.COMMAND, self.handle_text_message
@@ -163,28 +479,49 @@ class TelegramShopBot:
         # Error handler
         self.application.add_error_handler(self.error_handler)
     
+    async def handle_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Dispatch bot commands to their handler by command name."""
+        command = update.message.text.split()[0]
+        handler = self._command_routes.get(command.lstrip("/").split("@")[0].lower())
+        if handler:
+            await handler(update, context)
+
+    async def _count_callback(self, data: str):
+        """Record one press in the callback usage stats (best effort)."""
+        try:
+            await self.redis.hincrby("stats:callback_counts", data, 1)
+        except Exception as e:
+            logger.error(f"Error recording callback stats: {e}")
+
+    async def handle_callback_query(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Dispatch callback queries to their handler by data prefix."""
+        query = update.callback_query
+        if query.data:
+            # Cheap counter feeding profile-guided menu row ordering;
+            # fire-and-forget so a Redis blip never blocks or fails dispatch
+            asyncio.create_task(self._count_callback(query.data))
+        prefix, _, _ = (query.data or "").partition("_")
+        handler = self._callback_routes.get(prefix)
+        if handler:
+            await handler(update, context)
+        else:
+            await query.answer()
+
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command."""
         try:
-            user = update.effective_user
-            telegram_user = await get_or_create_user(user)
-            
-            welcome_message = await translate_text(
-                "Welcome to our crypto shop! 🛍️\n\n"
-                "You can browse our products, make purchases with cryptocurrency, "
-                "and track your orders all from this bot.\n\n"
-                "Use /menu to see available options or click the button below.",
-                telegram_user.language
-            )
+            telegram_user = await self._get_telegram_user(update, context)
             
+            welcome_message = self._static_text("welcome", telegram_user.language)
+
             keyboard = main_menu_keyboard(telegram_user.language)
-            
+
+            # The welcome text carries no markup, so skip the HTML parse pass
             await update.message.reply_text(
                 welcome_message,
-                reply_markup=keyboard,
-                parse_mode=ParseMode.HTML
+                reply_markup=keyboard
             )
-            
+
         except Exception as e:
             logger.error(f"Error in start command: {e}")
             await update.message.reply_text("Sorry, an error occurred. Please try again.")
@@ -192,33 +529,10 @@ class TelegramShopBot:
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /help command."""
         try:
-            user = update.effective_user
-            telegram_user = await get_or_create_user(user)
-            
-            help_text = await translate_text(
-                "🤖 <b>Shop Bot Help</b>\n\n"
-                "<b>Commands:</b>\n"
-                "/start - Start the bot and see welcome message\n"
-                "/menu - Show main menu\n"
-                "/cart - View your shopping cart\n"
-                "/orders - View your order history\n"
-                "/support - Contact customer support\n"
-                "/language - Change language\n"
-                "/profile - View your profile\n\n"
-                "<b>How to shop:</b>\n"
-                "1. Browse categories and products\n"
-                "2. Add items to your cart\n"
-                "3. Proceed to checkout\n"
-                "4. Pay with cryptocurrency\n"
-                "5. Receive your digital products instantly\n\n"
-                "<b>Payment:</b>\n"
-                "We accept various cryptocurrencies including Bitcoin, Ethereum, "
-                "and many others. All payments are processed securely.\n\n"
-                "<b>Support:</b>\n"
-                "Need help? Use /support to contact our customer service team.",
-                telegram_user.language
-            )
+            telegram_user = await self._get_telegram_user(update, context)
             
+            help_text = self._static_text("help", telegram_user.language)
+
             await update.message.reply_text(
                 help_text,
                 parse_mode=ParseMode.HTML
@@ -231,14 +545,10 @@ class TelegramShopBot:
     async def menu_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /menu command."""
         try:
-            user = update.effective_user
-            telegram_user = await get_or_create_user(user)
-            
-            menu_text = await translate_text(
-                "🛍️ <b>Main Menu</b>\n\nWhat would you like to do?",
-                telegram_user.language
-            )
+            telegram_user = await self._get_telegram_user(update, context)
             
+            menu_text = self._static_text("menu", telegram_user.language)
+
             keyboard = main_menu_keyboard(telegram_user.language)
             
             await update.message.reply_text(
@@ -254,9 +564,8 @@ class TelegramShopBot:
     async def cart_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /cart command."""
         try:
-            user = update.effective_user
-            telegram_user = await get_or_create_user(user)
-            cart = self.user_carts.get(user.id, {})
+            telegram_user = await self._get_telegram_user(update, context)
+            cart = await self.get_cart(telegram_user.telegram_id)
             
             if not cart:
                 empty_message = await translate_text(
@@ -267,33 +576,36 @@ class TelegramShopBot:
                 return
             
             # Calculate cart total
-            db = SessionLocal()
-            try:
+            async with AsyncSessionLocal() as db:
                 total_amount = 0
-                cart_text = await translate_text("🛒 <b>Your Cart</b>\n\n", telegram_user.language)
-                
+                cart_lines = [await translate_text("🛒 <b>Your Cart</b>\n\n", telegram_user.language)]
+
+                # Fetch all cart products in a single IN query
+                result = await db.execute(
+                    select(Product).where(Product.id.in_(cart.keys()))
+                )
+                products_by_id = {product.id: product for product in result.scalars()}
+
                 for product_id, quantity in cart.items():
-                    product = db.query(Product).filter(Product.id == product_id).first()
+                    product = products_by_id.get(product_id)
                     if product:
                         item_total = product.price * quantity
                         total_amount += item_total
-                        
-                        cart_text += f"• {product.name}\n"
-                        cart_text += f"  ${product.price:.2f} x {quantity} = ${item_total:.2f}\n\n"
-                
-                cart_text += f"<b>Total: ${total_amount:.2f}</b>"
-                
+
+                        cart_lines.append(f"• {escape_html(product.name)}\n")
+                        cart_lines.append(f"  ${product.price:.2f} x {quantity} = ${item_total:.2f}\n\n")
+
+                cart_lines.append(f"<b>Total: ${total_amount:.2f}</b>")
+                cart_text = "".join(cart_lines)
+
                 keyboard = cart_keyboard(telegram_user.language)
-                
+
                 await update.message.reply_text(
                     cart_text,
                     reply_markup=keyboard,
                     parse_mode=ParseMode.HTML
                 )
-                
-            finally:
-                db.close()
-                
+
         except Exception as e:
             logger.error(f"Error in cart command: {e}")
             await update.message.reply_text("Sorry, an error occurred. Please try again.")
@@ -301,15 +613,16 @@ class TelegramShopBot:
     async def orders_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /orders command."""
         try:
-            user = update.effective_user
-            telegram_user = await get_or_create_user(user)
+            telegram_user = await self._get_telegram_user(update, context)
             
-            db = SessionLocal()
-            try:
-                orders = db.query(Order).filter(
-                    Order.user_id == telegram_user.id
-                ).order_by(Order.created_at.desc()).limit(10).all()
-                
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(Order).where(
+                        Order.user_id == telegram_user.id
+                    ).order_by(Order.created_at.desc()).limit(10)
+                )
+                orders = result.scalars().all()
+
                 if not orders:
                     no_orders = await translate_text(
                         "📦 You haven't placed any orders yet.\n\nStart shopping to see your orders here!",
@@ -318,15 +631,17 @@ class TelegramShopBot:
                     await update.message.reply_text(no_orders)
                     return
                 
-                orders_text = await translate_text("📦 <b>Your Recent Orders</b>\n\n", telegram_user.language)
-                
+                order_lines = [await translate_text("📦 <b>Your Recent Orders</b>\n\n", telegram_user.language)]
+
                 for order in orders:
                     status_emoji = "⏳" if order.status == OrderStatus.PENDING else "✅"
-                    orders_text += f"{status_emoji} Order #{order.order_number}\n"
-                    orders_text += f"Amount: ${order.total_amount:.2f}\n"
-                    orders_text += f"Status: {order.status.value.title()}\n"
-                    orders_text += f"Date: {order.created_at.strftime('%Y-%m-%d %H:%M')}\n\n"
-                
+                    order_lines.append(f"{status_emoji} Order #{order.order_number}\n")
+                    order_lines.append(f"Amount: ${order.total_amount:.2f}\n")
+                    order_lines.append(f"Status: {order.status.value.title()}\n")
+                    order_lines.append(f"Date: {order.created_at.strftime('%Y-%m-%d %H:%M')}\n\n")
+
+                orders_text = "".join(order_lines)
+
                 keyboard = order_history_keyboard(telegram_user.language)
                 
                 await update.message.reply_text(
@@ -334,14 +649,36 @@ class TelegramShopBot:
                     reply_markup=keyboard,
                     parse_mode=ParseMode.HTML
                 )
-                
-            finally:
-                db.close()
-                
+
         except Exception as e:
             logger.error(f"Error in orders command: {e}")
             await update.message.reply_text("Sorry, an error occurred. Please try again.")
     
+    async def handle_categories_page(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Re-render the category keyboard for the requested page."""
+        try:
+            query = update.callback_query
+            await query.answer()
+
+            page = int(query.data.split("_")[2])
+            telegram_user = await self._get_telegram_user(update, context)
+
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(Category)
+                    .where(Category.is_active == True)
+                    .order_by(Category.sort_order, Category.name)
+                )
+                categories = result.scalars().all()
+
+            keyboard = category_keyboard(
+                categories, language=telegram_user.language, page=page
+            )
+            await query.edit_message_reply_markup(reply_markup=keyboard)
+
+        except Exception as e:
+            logger.error(f"Error paging categories: {e}")
+
     async def handle_category_selection(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle category selection."""
         try:
@@ -349,57 +686,53 @@ class TelegramShopBot:
             await query.answer()
             
             category_id = int(query.data.split("_")[1])
-            user = update.effective_user
-            telegram_user = await get_or_create_user(user)
+            telegram_user = await self._get_telegram_user(update, context)
             
-            db = SessionLocal()
-            try:
-                category = db.query(Category).filter(Category.id == category_id).first()
-                if not category:
-                    await query.edit_message_text("Category not found.")
-                    return
-                
-                products = db.query(Product).filter(
-                    Product.category_id == category_id,
-                    Product.is_active == True
-                ).all()
-                
-                if not products:
-                    no_products = await translate_text(
-                        f"No products available in {category.name} category.",
-                        telegram_user.language
-                    )
-                    await query.edit_message_text(no_products)
-                    return
-                
-                category_text = await translate_text(
-                    f"🏷️ <b>{category.name}</b>\n\n{category.description or ''}\n\nSelect a product:",
+            # Catalog rows are read-mostly; serve them from the Redis cache
+            category = await self.get_category_cached(category_id)
+            if not category:
+                await query.edit_message_text("Category not found.")
+                return
+
+            products = await self.list_active_products_cached(category_id)
+
+            if not products:
+                no_products = await translate_text(
+                    f"No products available in {category['name']} category.",
                     telegram_user.language
                 )
-                
-                keyboard = []
-                for product in products:
-                    keyboard.append([InlineKeyboardButton(
-                        f"{product.name} - ${product.price:.2f}",
-                        callback_data=f"product_{product.id}"
-                    )])
-                
+                await query.edit_message_text(no_products)
+                return
+
+            # Translate header and back label concurrently
+            category_text, back_label = await asyncio.gather(
+                translate_text(
+                    f"🏷️ <b>{category['name_html']}</b>\n\n{category['description_html']}\n\nSelect a product:",
+                    telegram_user.language
+                ),
+                translate_text("« Back to Categories", telegram_user.language)
+            )
+
+            keyboard = []
+            for product in products:
                 keyboard.append([InlineKeyboardButton(
-                    await translate_text("« Back to Categories", telegram_user.language),
-                    callback_data="back_to_categories"
+                    f"{product['name']} - ${product['price']:.2f}",
+                    callback_data=f"product_{product['id']}"
                 )])
-                
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                
-                await query.edit_message_text(
-                    category_text,
-                    reply_markup=reply_markup,
-                    parse_mode=ParseMode.HTML
-                )
-                
-            finally:
-                db.close()
-                
+
+            keyboard.append([InlineKeyboardButton(
+                back_label,
+                callback_data="back_to_categories"
+            )])
+
+            reply_markup = InlineKeyboardMarkup(keyboard)
+
+            await query.edit_message_text(
+                category_text,
+                reply_markup=reply_markup,
+                parse_mode=ParseMode.HTML
+            )
+
         except Exception as e:
             logger.error(f"Error handling category selection: {e}")
             await query.edit_message_text("Sorry, an error occurred. Please try again.")
@@ -411,19 +744,19 @@ class TelegramShopBot:
             await query.answer()
             
             product_id = int(query.data.split("_")[1])
-            user = update.effective_user
-            telegram_user = await get_or_create_user(user)
+            telegram_user = await self._get_telegram_user(update, context)
             
-            db = SessionLocal()
-            try:
-                product = db.query(Product).filter(Product.id == product_id).first()
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(Product).where(Product.id == product_id)
+                )
+                product = result.scalar_one_or_none()
                 if not product:
                     await query.edit_message_text("Product not found.")
                     return
-                
-                # Update view count
-                product.view_count += 1
-                db.commit()
+
+                # Record the view; counts are flushed to the DB in batches
+                self.record_product_view(product.id)
                 
                 product_text = await format_product_message(product, telegram_user.language)
                 keyboard = product_keyboard(product, telegram_user.language)
@@ -443,10 +776,7 @@ class TelegramShopBot:
                         reply_markup=keyboard,
                         parse_mode=ParseMode.HTML
                     )
-                
-            finally:
-                db.close()
-                
+
         except Exception as e:
             logger.error(f"Error handling product selection: {e}")
             await query.edit_message_text("Sorry, an error occurred. Please try again.")
@@ -460,21 +790,15 @@ class TelegramShopBot:
             action_data = query.data.split("_")
             action = action_data[1]
             
-            user = update.effective_user
-            telegram_user = await get_or_create_user(user)
+            telegram_user = await self._get_telegram_user(update, context)
             
             if action == "add":
                 product_id = int(action_data[2])
                 quantity = int(action_data[3]) if len(action_data) > 3 else 1
-                
+
                 # Add to cart
-                if user.id not in self.user_carts:
-                    self.user_carts[user.id] = {}
-                
-                self.user_carts[user.id][product_id] = (
-                    self.user_carts[user.id].get(product_id, 0) + quantity
-                )
-                
+                await self.add_to_cart(telegram_user.telegram_id, product_id, quantity)
+
                 success_message = await translate_text(
                     f"✅ Product added to cart! Quantity: {quantity}",
                     telegram_user.language
@@ -491,7 +815,7 @@ class TelegramShopBot:
     async def start_checkout(self, query, telegram_user):
         """Start the checkout process."""
         try:
-            cart = self.user_carts.get(telegram_user.telegram_id, {})
+            cart = await self.get_cart(telegram_user.telegram_id)
             if not cart:
                 empty_cart = await translate_text(
                     "Your cart is empty. Add some products first!",
@@ -500,65 +824,103 @@ class TelegramShopBot:
                 await query.answer(empty_cart, show_alert=True)
                 return
             
-            db = SessionLocal()
-            try:
+            # One clock read per checkout; everything below derives from it
+            now = datetime.now(timezone.utc)
+
+            async with AsyncSessionLocal() as db:
                 # Create order
-                order_number = f"ORD-{datetime.now().strftime('%Y%m%d')}-{uuid.uuid4().hex[:8].upper()}"
-                
+                date_str = now.strftime('%Y%m%d')
+                seq = await self._next_order_sequence(date_str)
+                order_number = f"ORD-{date_str}-{seq:X}"
+
                 # Calculate totals
                 subtotal = 0
                 order_items = []
-                
-                for product_id, quantity in cart.items():
-                    product = db.query(Product).filter(Product.id == product_id).first()
-                    if product:
-                        item_total = product.price * quantity
-                        subtotal += item_total
-                        order_items.append({
-                            "product": product,
-                            "quantity": quantity,
-                            "unit_price": product.price,
-                            "total_price": item_total
-                        })
-                
-                # Create order
-                order = Order(
-                    order_number=order_number,
-                    user_id=telegram_user.id,
-                    status=OrderStatus.PENDING,
-                    subtotal=subtotal,
-                    total_amount=subtotal,  # TODO: Add tax and shipping
-                    currency="USD"
-                )
-                
-                db.add(order)
-                db.flush()  # Get the order ID
-                
-                # Create order items
-                for item_data in order_items:
-                    order_item = OrderItem(
-                        order_id=order.id,
-                        product_id=item_data["product"].id,
-                        quantity=item_data["quantity"],
-                        unit_price=item_data["unit_price"],
-                        total_price=item_data["total_price"],
-                        product_name=item_data["product"].name,
-                        product_sku=item_data["product"].sku
+
+                # Run the product fetch and both inserts as one explicit
+                # transaction — a single round-trip sequence to the database
+                async with db.begin():
+                    # Lock cart products for the checkout; rows locked by a
+                    # concurrent checkout are skipped instead of blocking
+                    result = await db.execute(
+                        select(Product)
+                        .where(Product.id.in_(cart.keys()))
+                        .with_for_update(skip_locked=True)
                     )
-                    db.add(order_item)
-                
-                db.commit()
-                
+                    products_by_id = {product.id: product for product in result.scalars()}
+
+                    # Products held by a concurrent checkout (or deleted)
+                    # are missing here. Creating an order from the subset
+                    # would charge the wrong total — or $0 with an empty
+                    # subset — so keep the cart and have the user retry.
+                    if len(products_by_id) != len(cart):
+                        busy_text = await translate_text(
+                            "Checkout is busy right now. Please try again in a moment.",
+                            telegram_user.language
+                        )
+                        await query.answer(busy_text, show_alert=True)
+                        return
+
+                    for product_id, quantity in cart.items():
+                        product = products_by_id.get(product_id)
+                        if product:
+                            item_total = product.price * quantity
+                            subtotal += item_total
+                            order_items.append({
+                                "product": product,
+                                "quantity": quantity,
+                                "unit_price": product.price,
+                                "total_price": item_total
+                            })
+
+                    # One-line item summary denormalized onto the order so
+                    # admin list views need no OrderItem join
+                    summary_line = None
+                    if order_items:
+                        first = order_items[0]
+                        summary_line = f"{first['product'].name} ×{first['quantity']}"
+                        if len(order_items) > 1:
+                            summary_line += f" (+{len(order_items) - 1} more)"
+
+                    # Create order
+                    order = Order(
+                        order_number=order_number,
+                        user_id=telegram_user.id,
+                        status=OrderStatus.PENDING,
+                        subtotal=subtotal,
+                        total_amount=subtotal,  # TODO: Add tax and shipping
+                        currency="USD",
+                        customer_username=telegram_user.username,
+                        summary_line=summary_line
+                    )
+
+                    db.add(order)
+                    await db.flush()  # Get the order ID
+
+                    # Insert all order items with one multi-row statement
+                    if order_items:
+                        await db.execute(
+                            OrderItem.__table__.insert(),
+                            [
+                                {
+                                    "order_id": order.id,
+                                    "product_id": item_data["product"].id,
+                                    "quantity": item_data["quantity"],
+                                    "unit_price": item_data["unit_price"],
+                                    "total_price": item_data["total_price"],
+                                    "product_name": item_data["product"].name,
+                                    "product_sku": item_data["product"].sku
+                                }
+                                for item_data in order_items
+                            ]
+                        )
+
                 # Clear cart
-                if telegram_user.telegram_id in self.user_carts:
-                    del self.user_carts[telegram_user.telegram_id]
-                
+                await self.clear_cart(telegram_user.telegram_id)
+
                 # Show payment options
                 await self.show_payment_options(query, order, telegram_user)
-                
-            finally:
-                db.close()
-                
+
         except Exception as e:
             logger.error(f"Error in checkout: {e}")
             await query.answer("Checkout failed. Please try again.", show_alert=True)
@@ -615,8 +977,7 @@ class TelegramShopBot:
             action_data = query.data.split("_")
             action = action_data[1]
             
-            user = update.effective_user
-            telegram_user = await get_or_create_user(user)
+            telegram_user = await self._get_telegram_user(update, context)
             
             if action == "crypto":
                 order_id = int(action_data[2])
@@ -631,9 +992,14 @@ class TelegramShopBot:
     async def process_crypto_payment(self, query, order_id, currency, telegram_user):
         """Process cryptocurrency payment."""
         try:
-            db = SessionLocal()
-            try:
-                order = db.query(Order).filter(Order.id == order_id).first()
+            # One clock read per payment request
+            now = datetime.now(timezone.utc)
+
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(Order).where(Order.id == order_id)
+                )
+                order = result.scalar_one_or_none()
                 if not order:
                     await query.edit_message_text("Order not found.")
                     return
@@ -660,15 +1026,18 @@ class TelegramShopBot:
                     pay_amount=payment_data.get("pay_amount"),
                     pay_currency=currency.upper(),
                     purchase_id=payment_data.get("purchase_id"),
-                    expires_at=datetime.now(timezone.utc)
+                    expires_at=now + timedelta(minutes=settings.payment_timeout_minutes)
                 )
                 
                 db.add(payment)
-                db.commit()
+                await db.commit()
                 
                 # Generate QR code
                 qr_data = await nowpayments_service.create_qr_payment_data(payment_data)
-                qr_info = qr_generator.create_payment_qr_data(
+                # PIL rendering and PNG encoding are CPU-bound; run them off
+                # the event loop so other updates keep flowing
+                qr_info = await asyncio.to_thread(
+                    qr_generator.create_payment_qr_data,
                     payment_uri=qr_data.get("qr_data", ""),
                     amount=str(payment_data.get("pay_amount", "")),
                     currency=currency.upper(),
@@ -680,7 +1049,7 @@ class TelegramShopBot:
                     f"💰 <b>Payment Instructions</b>\n\n"
                     f"Order: #{order.order_number}\n"
                     f"Amount to pay: {payment_data.get('pay_amount')} {currency.upper()}\n"
-                    f"Address: <code>{payment_data.get('pay_address')}</code>\n\n"
+                    f"Address: <code>{escape_html(payment_data.get('pay_address') or '')}</code>\n\n"
                     f"Please send the exact amount to the address above.\n"
                     f"Payment will be automatically confirmed.",
                     telegram_user.language
@@ -707,10 +1076,7 @@ class TelegramShopBot:
                         reply_markup=keyboard,
                         parse_mode=ParseMode.HTML
                     )
-                
-            finally:
-                db.close()
-                
+
         except Exception as e:
             logger.error(f"Error processing crypto payment: {e}")
             await query.edit_message_text("Payment processing failed. Please try again.")
@@ -764,11 +1130,11 @@ class TelegramShopBot:
     
     async def support_message_received(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle support message."""
-        return ConversationHandler.END
+        return _END
     
     async def cancel_support(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Cancel support conversation."""
-        return ConversationHandler.END
+        return _END
     
     async def handle_support_action(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle support-related callback queries."""
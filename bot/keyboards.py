@@ -1,651 +1,707 @@
 """
 Keyboard layouts for the Telegram shop bot.
 """
+import asyncio
+import sys
+from itertools import zip_longest
+
+import aiosqlite
+import orjson
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+from config.settings import get_settings
 from database.models import Product, Category
 from .utils import translate_text
 
+settings = get_settings()
+
+# Canonical button keys -> English source labels. Everything a keyboard can
+# show lives here, so the whole set can be translated in one startup pass.
+LABELS: Dict[str, str] = {
+    "browse_products": "🛍️ Browse Products",
+    "my_cart": "🛒 My Cart",
+    "my_orders": "📦 My Orders",
+    "profile": "👤 Profile",
+    "referrals": "🎁 Referrals",
+    "promotions": "🎯 Promotions",
+    "support": "💡 Support",
+    "language": "🌐 Language",
+    "help": "ℹ️ Help",
+    "prev_page": "« Prev",
+    "next_page": "Next »",
+    "back_to_menu": "« Back to Menu",
+    "back_to_category": "« Back to Category",
+    "back_to_cart": "« Back to Cart",
+    "back_to_orders": "« Back to Orders",
+    "cancel": "« Cancel",
+    "exit_admin": "« Exit Admin",
+    "add_1": "➕ Add 1 to Cart",
+    "add_3": "🛒 Add 3 to Cart",
+    "add_5": "🛒 Add 5 to Cart",
+    "out_of_stock": "❌ Out of Stock",
+    "reviews": "📝 Reviews",
+    "share": "📤 Share",
+    "checkout": "💳 Checkout",
+    "clear_cart": "🗑️ Clear Cart",
+    "edit_items": "📝 Edit Items",
+    "continue_shopping": "🛍️ Continue Shopping",
+    "btc": "₿ Bitcoin (BTC)",
+    "eth": "Ξ Ethereum (ETH)",
+    "usdt": "₮ Tether (USDT)",
+    "link": "🔗 Chainlink (LINK)",
+    "more_cryptos": "🪙 More Cryptos",
+    "refresh_status": "🔄 Refresh Status",
+    "payment_help": "❓ Payment Help",
+    "contact_support": "📞 Contact Support",
+    "filter_orders": "🔍 Filter Orders",
+    "export_history": "📊 Export History",
+    "refresh": "🔄 Refresh",
+    "email_receipt": "📧 Email Receipt",
+    "shop_again": "🛍️ Shop Again",
+    "order_details": "📋 Order Details",
+    "track_order": "📦 Track Order",
+    "download_items": "📥 Download Items",
+    "reorder": "🔄 Reorder",
+    "order_support": "📞 Support",
+    "new_ticket": "🎫 New Ticket",
+    "my_tickets": "📋 My Tickets",
+    "faq": "❓ FAQ",
+    "help_center": "📚 Help Center",
+    "live_chat": "💬 Live Chat",
+    "email_support": "📧 Email Support",
+    "support_payment": "💳 Payment Issues",
+    "support_order": "📦 Order Problems",
+    "support_technical": "🔧 Technical Issues",
+    "support_product": "🛍️ Product Questions",
+    "support_refund": "🎁 Refunds & Returns",
+    "support_account": "📋 Account Issues",
+    "support_other": "❓ Other",
+    "edit_profile": "✏️ Edit Profile",
+    "security": "🔒 Security",
+    "loyalty_points": "💎 Loyalty Points",
+    "statistics": "📊 Statistics",
+    "notifications": "📱 Notifications",
+    "delete_account": "🗑️ Delete Account",
+    "referral_code": "📋 My Referral Code",
+    "referral_stats": "📊 Referral Stats",
+    "earnings": "💰 Earnings",
+    "my_referrals": "👥 My Referrals",
+    "share_link": "📤 Share Link",
+    "how_it_works": "ℹ️ How it Works",
+    "active_promotions": "🎯 Active Promotions",
+    "discount_codes": "🏷️ Discount Codes",
+    "featured_deals": "⭐ Featured Deals",
+    "flash_sales": "🔥 Flash Sales",
+    "vip_offers": "💎 VIP Offers",
+    "free_items": "🎁 Free Items",
+    "admin_analytics": "📊 Analytics",
+    "admin_users": "👥 Users",
+    "admin_orders": "📦 Orders",
+    "admin_products": "🛍️ Products",
+    "admin_payments": "💳 Payments",
+    "admin_support": "🎫 Support",
+    "admin_settings": "⚙️ Settings",
+    "admin_broadcast": "📱 Broadcast",
+}
+
+# canonical_key -> {language: translated label}, filled once at bot startup.
+# With the table in place, keyboard builders are plain synchronous functions.
+BUTTON_LABELS: Dict[str, Dict[str, str]] = {}
+
+# Selectable languages for the language picker, hoisted so the tuple is
+# allocated once at import instead of per render
+SUPPORTED_LANGUAGES: Tuple[Tuple[str, str], ...] = (
+    ("🇺🇸 English", "en"),
+    ("🇱🇹 Lietuvių", "lt"),
+    ("🇪🇸 Español", "es"),
+    ("🇫🇷 Français", "fr"),
+    ("🇩🇪 Deutsch", "de"),
+    ("🇷🇺 Русский", "ru"),
+)
+
+# callback_data values shared by several keyboards, interned so every
+# markup references one string object per action
+CB_BACK_TO_MENU = sys.intern("back_to_menu")
+CB_BROWSE_PRODUCTS = sys.intern("browse_products")
+CB_VIEW_CART = sys.intern("view_cart")
+CB_VIEW_ORDERS = sys.intern("view_orders")
+
+# Main menu rows as (label_key, callback_data) pairs. The default order is
+# hand-picked; apply_menu_usage() reorders rows from observed click counts
+# so the hottest actions sit at the top of the menu.
+_MAIN_MENU_ROWS: List[Tuple[Tuple[str, str], ...]] = [
+    (("browse_products", CB_BROWSE_PRODUCTS),),
+    (("my_cart", CB_VIEW_CART), ("my_orders", CB_VIEW_ORDERS)),
+    (("profile", "view_profile"), ("referrals", "referral_program")),
+    (("promotions", "view_promotions"), ("support", "support_menu")),
+    (("language", "change_language"), ("help", "show_help")),
+]
+
+# Fully built InlineKeyboardMarkup objects for keyboards whose layout is
+# constant per language. Once the labels are known the whole markup is a
+# compile-time constant, so each render is a single dict lookup.
+#
+# The cached markups are shared singletons built from tuple rows: callers
+# must treat them as immutable and never modify the returned object or its
+# rows. python-telegram-bot only iterates the structure when serializing.
+_KEYBOARD_CACHE: Dict[Tuple[str, str], InlineKeyboardMarkup] = {}
+
+
+class _CachedMarkup(InlineKeyboardMarkup):
+    """
+    InlineKeyboardMarkup whose wire payload is serialized exactly once.
+
+    python-telegram-bot rebuilds the reply_markup dict and JSON-encodes it
+    on every outbound request. The cached static keyboards never change, so
+    the dict and JSON forms are precomputed at construction time and the
+    serialization hooks short-circuit to them.
+    """
+
+    __slots__ = ("_dict_cache", "_json_cache")
+
+    def __init__(self, inline_keyboard):
+        super().__init__(inline_keyboard)
+        dict_cache = super().to_dict()
+        object.__setattr__(self, "_dict_cache", dict_cache)
+        object.__setattr__(self, "_json_cache", orjson.dumps(dict_cache).decode())
+
+    def to_dict(self, recursive: bool = True) -> dict:
+        return self._dict_cache
+
+    def to_json(self) -> str:
+        return self._json_cache
+
+
+def _label(key: str, language: str) -> str:
+    """Look up a translated button label, falling back to English."""
+    translations = BUTTON_LABELS.get(key)
+    if translations:
+        cached = translations.get(language)
+        if cached is not None:
+            return cached
+    return LABELS[key]
+
+
+def _back_to_menu_row(language: str) -> Tuple[InlineKeyboardButton, ...]:
+    """Shared "« Back to Menu" row used by most menus."""
+    return (InlineKeyboardButton(
+        _label("back_to_menu", language), callback_data=CB_BACK_TO_MENU
+    ),)
+
+
+# Cap on concurrent translator calls while warming labels, so a remote
+# i18n backend's connection pool is never exhausted at startup
+_TRANSLATE_CONCURRENCY = 8
+
+# On-disk cache of translated labels so restarts skip the translator
+# entirely for labels already resolved by an earlier run
+_TRANSLATION_DB_PATH = "translation_cache.sqlite3"
+
+
+async def _sem_translate(text: str, language: str, sem: asyncio.Semaphore) -> str:
+    """Translate one label while holding a slot on the shared semaphore."""
+    async with sem:
+        return await translate_text(text, language)
+
+
+async def preload_keyboard_translations() -> None:
+    """
+    Translate the full label table for every supported language at startup.
+
+    Previously resolved labels are loaded from a small sqlite cache first;
+    only missing (key, language) pairs hit the translator, and new results
+    are written back so later restarts start warm.
+    """
+    keys = list(LABELS)
+    sem = asyncio.Semaphore(_TRANSLATE_CONCURRENCY)
+
+    async with aiosqlite.connect(_TRANSLATION_DB_PATH) as db:
+        await db.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT NOT NULL, language TEXT NOT NULL, value TEXT NOT NULL, "
+            "PRIMARY KEY (key, language))"
+        )
+
+        async with db.execute("SELECT key, language, value FROM translations") as cursor:
+            async for key, language, value in cursor:
+                if key in LABELS:
+                    BUTTON_LABELS.setdefault(key, {})[language] = value
+
+        for language in settings.supported_languages:
+            missing = [
+                key for key in keys
+                if language not in BUTTON_LABELS.get(key, {})
+            ]
+            if not missing:
+                continue
+
+            async with asyncio.TaskGroup() as tg:
+                tasks = [
+                    tg.create_task(_sem_translate(LABELS[key], language, sem))
+                    for key in missing
+                ]
+
+            rows = []
+            for key, task in zip(missing, tasks):
+                text = task.result()
+                BUTTON_LABELS.setdefault(key, {})[language] = text
+                rows.append((key, language, text))
+
+            await db.executemany(
+                "INSERT OR REPLACE INTO translations (key, language, value) "
+                "VALUES (?, ?, ?)",
+                rows
+            )
+            await db.commit()
+
+
+def warm_static_keyboards() -> None:
+    """Pre-build every static keyboard per supported language at startup."""
+    for builder in _STATIC_KEYBOARDS:
+        for language in settings.supported_languages:
+            builder(language)
 
-async def main_menu_keyboard(language: str = "en") -> InlineKeyboardMarkup:
+
+def main_menu_keyboard(language: str = "en") -> InlineKeyboardMarkup:
     """Create main menu keyboard."""
+    cached = _KEYBOARD_CACHE.get(("main", language))
+    if cached is not None:
+        return cached
+
+    keyboard = tuple(
+        tuple(
+            InlineKeyboardButton(_label(key, language), callback_data=cb)
+            for key, cb in row
+        )
+        for row in _MAIN_MENU_ROWS
+    )
+    markup = _CachedMarkup(keyboard)
+    _KEYBOARD_CACHE[("main", language)] = markup
+    return markup
+
+
+def apply_menu_usage(counts: Dict[str, int]) -> None:
+    """
+    Reorder main-menu rows so the most-clicked actions render first.
+
+    counts maps callback_data -> observed click count. Cached main-menu
+    markups are dropped so the next render picks up the new order.
+    """
+    _MAIN_MENU_ROWS.sort(
+        key=lambda row: -sum(counts.get(cb, 0) for _, cb in row)
+    )
+    for language in settings.supported_languages:
+        _KEYBOARD_CACHE.pop(("main", language), None)
+
+
+def category_keyboard(
+    categories: List[Category],
+    language: str = "en",
+    page: int = 0,
+    page_size: int = 10
+) -> InlineKeyboardMarkup:
+    """Create category selection keyboard, paged for large catalogs."""
+    # Only build buttons for the visible page; category names come from
+    # the database and are shown untranslated
+    start = page * page_size
+    visible = categories[start:start + page_size]
+
+    # Pack categories into rows of 2 by zipping the iterator with itself
+    it = iter(visible)
     keyboard = [
         [
             InlineKeyboardButton(
-                await translate_text("🛍️ Browse Products", language),
-                callback_data="browse_products"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("🛒 My Cart", language),
-                callback_data="view_cart"
-            ),
-            InlineKeyboardButton(
-                await translate_text("📦 My Orders", language),
-                callback_data="view_orders"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("👤 Profile", language),
-                callback_data="view_profile"
-            ),
-            InlineKeyboardButton(
-                await translate_text("🎁 Referrals", language),
-                callback_data="referral_program"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("🎯 Promotions", language),
-                callback_data="view_promotions"
-            ),
-            InlineKeyboardButton(
-                await translate_text("💡 Support", language),
-                callback_data="support_menu"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("🌐 Language", language),
-                callback_data="change_language"
-            ),
-            InlineKeyboardButton(
-                await translate_text("ℹ️ Help", language),
-                callback_data="show_help"
+                f"🏷️ {category.name}",
+                callback_data=f"category_{category.id}"
             )
+            for category in pair if category is not None
         ]
+        for pair in zip_longest(it, it)
     ]
-    return InlineKeyboardMarkup(keyboard)
 
+    # Paging controls
+    nav_row = []
+    if page > 0:
+        nav_row.append(InlineKeyboardButton(
+            _label("prev_page", language),
+            callback_data=f"categories_page_{page - 1}"
+        ))
+    if start + page_size < len(categories):
+        nav_row.append(InlineKeyboardButton(
+            _label("next_page", language),
+            callback_data=f"categories_page_{page + 1}"
+        ))
+    if nav_row:
+        keyboard.append(nav_row)
 
-async def category_keyboard(categories: List[Category], language: str = "en") -> InlineKeyboardMarkup:
-    """Create category selection keyboard."""
-    keyboard = []
-    
-    # Add categories in rows of 2
-    for i in range(0, len(categories), 2):
-        row = []
-        for j in range(2):
-            if i + j < len(categories):
-                category = categories[i + j]
-                row.append(InlineKeyboardButton(
-                    f"🏷️ {category.name}",
-                    callback_data=f"category_{category.id}"
-                ))
-        keyboard.append(row)
-    
     # Add back button
-    keyboard.append([
-        InlineKeyboardButton(
-            await translate_text("« Back to Menu", language),
-            callback_data="back_to_menu"
-        )
-    ])
-    
+    keyboard.append(_back_to_menu_row(language))
+
     return InlineKeyboardMarkup(keyboard)
 
 
-async def product_keyboard(product: Product, language: str = "en") -> InlineKeyboardMarkup:
+# Out-of-stock row is identical for every product; built once per language
+_OUT_OF_STOCK_ROWS: Dict[str, Tuple[InlineKeyboardButton, ...]] = {}
+
+
+def _out_of_stock_row(language: str) -> Tuple[InlineKeyboardButton, ...]:
+    """Shared out-of-stock row, cached per language."""
+    row = _OUT_OF_STOCK_ROWS.get(language)
+    if row is None:
+        row = (InlineKeyboardButton(
+            _label("out_of_stock", language), callback_data="out_of_stock"
+        ),)
+        _OUT_OF_STOCK_ROWS[language] = row
+    return row
+
+
+def product_keyboard(product: Product, language: str = "en") -> InlineKeyboardMarkup:
     """Create product details keyboard."""
     keyboard = []
-    
+
     # Add to cart options
     if product.stock_quantity > 0 or not product.track_inventory:
         keyboard.extend([
             [
-                InlineKeyboardButton(
-                    await translate_text("➕ Add 1 to Cart", language),
-                    callback_data=f"cart_add_{product.id}_1"
-                )
+                InlineKeyboardButton(_label("add_1", language), callback_data=f"cart_add_{product.id}_1")
             ],
             [
-                InlineKeyboardButton(
-                    await translate_text("🛒 Add 3 to Cart", language),
-                    callback_data=f"cart_add_{product.id}_3"
-                ),
-                InlineKeyboardButton(
-                    await translate_text("🛒 Add 5 to Cart", language),
-                    callback_data=f"cart_add_{product.id}_5"
-                )
+                InlineKeyboardButton(_label("add_3", language), callback_data=f"cart_add_{product.id}_3"),
+                InlineKeyboardButton(_label("add_5", language), callback_data=f"cart_add_{product.id}_5")
             ]
         ])
     else:
-        keyboard.append([
-            InlineKeyboardButton(
-                await translate_text("❌ Out of Stock", language),
-                callback_data="out_of_stock"
-            )
-        ])
-    
+        keyboard.append(_out_of_stock_row(language))
+
     # Product actions
     keyboard.extend([
         [
-            InlineKeyboardButton(
-                await translate_text("📝 Reviews", language),
-                callback_data=f"product_reviews_{product.id}"
-            ),
-            InlineKeyboardButton(
-                await translate_text("📤 Share", language),
-                callback_data=f"product_share_{product.id}"
-            )
+            InlineKeyboardButton(_label("reviews", language), callback_data=f"product_reviews_{product.id}"),
+            InlineKeyboardButton(_label("share", language), callback_data=f"product_share_{product.id}")
         ],
         [
-            InlineKeyboardButton(
-                await translate_text("« Back to Category", language),
-                callback_data=f"category_{product.category_id}"
-            )
+            InlineKeyboardButton(_label("back_to_category", language), callback_data=f"category_{product.category_id}")
         ]
     ])
-    
-    return InlineKeyboardMarkup(keyboard)
-
 
-async def cart_keyboard(language: str = "en") -> InlineKeyboardMarkup:
-    """Create cart management keyboard."""
-    keyboard = [
-        [
-            InlineKeyboardButton(
-                await translate_text("💳 Checkout", language),
-                callback_data="cart_checkout"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("🗑️ Clear Cart", language),
-                callback_data="cart_clear"
-            ),
-            InlineKeyboardButton(
-                await translate_text("📝 Edit Items", language),
-                callback_data="cart_edit"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("🛍️ Continue Shopping", language),
-                callback_data="browse_products"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("« Back to Menu", language),
-                callback_data="back_to_menu"
-            )
-        ]
-    ]
     return InlineKeyboardMarkup(keyboard)
 
 
-async def payment_keyboard(language: str = "en") -> InlineKeyboardMarkup:
+def cart_keyboard(language: str = "en") -> InlineKeyboardMarkup:
+    """Create cart management keyboard."""
+    cached = _KEYBOARD_CACHE.get(("cart", language))
+    if cached is not None:
+        return cached
+
+    keyboard = (
+        (
+            InlineKeyboardButton(_label("checkout", language), callback_data="cart_checkout"),
+        ),
+        (
+            InlineKeyboardButton(_label("clear_cart", language), callback_data="cart_clear"),
+            InlineKeyboardButton(_label("edit_items", language), callback_data="cart_edit"),
+        ),
+        (
+            InlineKeyboardButton(_label("continue_shopping", language), callback_data=CB_BROWSE_PRODUCTS),
+        ),
+        _back_to_menu_row(language),
+    )
+    markup = _CachedMarkup(keyboard)
+    _KEYBOARD_CACHE[("cart", language)] = markup
+    return markup
+
+
+def payment_keyboard(language: str = "en") -> InlineKeyboardMarkup:
     """Create payment method selection keyboard."""
-    keyboard = [
-        [
-            InlineKeyboardButton(
-                await translate_text("₿ Bitcoin (BTC)", language),
-                callback_data="payment_crypto_btc"
-            ),
-            InlineKeyboardButton(
-                await translate_text("Ξ Ethereum (ETH)", language),
-                callback_data="payment_crypto_eth"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("₮ Tether (USDT)", language),
-                callback_data="payment_crypto_usdt"
-            ),
-            InlineKeyboardButton(
-                await translate_text("🔗 Chainlink (LINK)", language),
-                callback_data="payment_crypto_link"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("🪙 More Cryptos", language),
-                callback_data="payment_more_cryptos"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("« Back to Cart", language),
-                callback_data="view_cart"
-            )
-        ]
-    ]
-    return InlineKeyboardMarkup(keyboard)
-
-
-async def payment_status_keyboard(payment_id: int, language: str = "en") -> InlineKeyboardMarkup:
+    cached = _KEYBOARD_CACHE.get(("payment", language))
+    if cached is not None:
+        return cached
+
+    keyboard = (
+        (
+            InlineKeyboardButton(_label("btc", language), callback_data="payment_crypto_btc"),
+            InlineKeyboardButton(_label("eth", language), callback_data="payment_crypto_eth"),
+        ),
+        (
+            InlineKeyboardButton(_label("usdt", language), callback_data="payment_crypto_usdt"),
+            InlineKeyboardButton(_label("link", language), callback_data="payment_crypto_link"),
+        ),
+        (
+            InlineKeyboardButton(_label("more_cryptos", language), callback_data="payment_more_cryptos"),
+        ),
+        (
+            InlineKeyboardButton(_label("back_to_cart", language), callback_data=CB_VIEW_CART),
+        ),
+    )
+    markup = _CachedMarkup(keyboard)
+    _KEYBOARD_CACHE[("payment", language)] = markup
+    return markup
+
+
+def payment_status_keyboard(payment_id: int, language: str = "en") -> InlineKeyboardMarkup:
     """Create payment status check keyboard."""
-    keyboard = [
-        [
-            InlineKeyboardButton(
-                await translate_text("🔄 Refresh Status", language),
-                callback_data=f"payment_status_{payment_id}"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("❓ Payment Help", language),
-                callback_data=f"payment_help_{payment_id}"
-            ),
-            InlineKeyboardButton(
-                await translate_text("📞 Contact Support", language),
-                callback_data="support_payment"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("📦 My Orders", language),
-                callback_data="view_orders"
-            )
-        ]
-    ]
+    keyboard = (
+        (
+            InlineKeyboardButton(_label("refresh_status", language), callback_data=f"payment_status_{payment_id}"),
+        ),
+        (
+            InlineKeyboardButton(_label("payment_help", language), callback_data=f"payment_help_{payment_id}"),
+            InlineKeyboardButton(_label("contact_support", language), callback_data="support_payment"),
+        ),
+        (
+            InlineKeyboardButton(_label("my_orders", language), callback_data=CB_VIEW_ORDERS),
+        ),
+    )
     return InlineKeyboardMarkup(keyboard)
 
 
-async def order_history_keyboard(language: str = "en") -> InlineKeyboardMarkup:
+def order_history_keyboard(language: str = "en") -> InlineKeyboardMarkup:
     """Create order history keyboard."""
-    keyboard = [
-        [
-            InlineKeyboardButton(
-                await translate_text("🔍 Filter Orders", language),
-                callback_data="orders_filter"
-            ),
-            InlineKeyboardButton(
-                await translate_text("📊 Export History", language),
-                callback_data="orders_export"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("🔄 Refresh", language),
-                callback_data="orders_refresh"
-            ),
-            InlineKeyboardButton(
-                await translate_text("📧 Email Receipt", language),
-                callback_data="orders_email"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("🛍️ Shop Again", language),
-                callback_data="browse_products"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("« Back to Menu", language),
-                callback_data="back_to_menu"
-            )
-        ]
-    ]
-    return InlineKeyboardMarkup(keyboard)
-
-
-async def order_details_keyboard(order_id: int, language: str = "en") -> InlineKeyboardMarkup:
+    cached = _KEYBOARD_CACHE.get(("order_history", language))
+    if cached is not None:
+        return cached
+
+    keyboard = (
+        (
+            InlineKeyboardButton(_label("filter_orders", language), callback_data="orders_filter"),
+            InlineKeyboardButton(_label("export_history", language), callback_data="orders_export"),
+        ),
+        (
+            InlineKeyboardButton(_label("refresh", language), callback_data="orders_refresh"),
+            InlineKeyboardButton(_label("email_receipt", language), callback_data="orders_email"),
+        ),
+        (
+            InlineKeyboardButton(_label("shop_again", language), callback_data=CB_BROWSE_PRODUCTS),
+        ),
+        _back_to_menu_row(language),
+    )
+    markup = _CachedMarkup(keyboard)
+    _KEYBOARD_CACHE[("order_history", language)] = markup
+    return markup
+
+
+def order_details_keyboard(order_id: int, language: str = "en") -> InlineKeyboardMarkup:
     """Create order details keyboard."""
-    keyboard = [
-        [
-            InlineKeyboardButton(
-                await translate_text("📋 Order Details", language),
-                callback_data=f"order_details_{order_id}"
-            ),
-            InlineKeyboardButton(
-                await translate_text("📦 Track Order", language),
-                callback_data=f"order_track_{order_id}"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("📥 Download Items", language),
-                callback_data=f"order_download_{order_id}"
-            ),
-            InlineKeyboardButton(
-                await translate_text("🔄 Reorder", language),
-                callback_data=f"order_reorder_{order_id}"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("📞 Support", language),
-                callback_data=f"support_order_{order_id}"
-            ),
-            InlineKeyboardButton(
-                await translate_text("📧 Email Receipt", language),
-                callback_data=f"order_receipt_{order_id}"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("« Back to Orders", language),
-                callback_data="view_orders"
-            )
-        ]
-    ]
+    keyboard = (
+        (
+            InlineKeyboardButton(_label("order_details", language), callback_data=f"order_details_{order_id}"),
+            InlineKeyboardButton(_label("track_order", language), callback_data=f"order_track_{order_id}"),
+        ),
+        (
+            InlineKeyboardButton(_label("download_items", language), callback_data=f"order_download_{order_id}"),
+            InlineKeyboardButton(_label("reorder", language), callback_data=f"order_reorder_{order_id}"),
+        ),
+        (
+            InlineKeyboardButton(_label("order_support", language), callback_data=f"support_order_{order_id}"),
+            InlineKeyboardButton(_label("email_receipt", language), callback_data=f"order_receipt_{order_id}"),
+        ),
+        (
+            InlineKeyboardButton(_label("back_to_orders", language), callback_data=CB_VIEW_ORDERS),
+        ),
+    )
     return InlineKeyboardMarkup(keyboard)
 
 
-async def support_menu_keyboard(language: str = "en") -> InlineKeyboardMarkup:
+def support_menu_keyboard(language: str = "en") -> InlineKeyboardMarkup:
     """Create support menu keyboard."""
-    keyboard = [
-        [
-            InlineKeyboardButton(
-                await translate_text("🎫 New Ticket", language),
-                callback_data="support_new"
-            ),
-            InlineKeyboardButton(
-                await translate_text("📋 My Tickets", language),
-                callback_data="support_tickets"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("❓ FAQ", language),
-                callback_data="support_faq"
-            ),
-            InlineKeyboardButton(
-                await translate_text("📚 Help Center", language),
-                callback_data="support_help"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("💬 Live Chat", language),
-                callback_data="support_chat"
-            ),
-            InlineKeyboardButton(
-                await translate_text("📧 Email Support", language),
-                callback_data="support_email"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("« Back to Menu", language),
-                callback_data="back_to_menu"
-            )
-        ]
-    ]
-    return InlineKeyboardMarkup(keyboard)
-
-
-async def support_category_keyboard(language: str = "en") -> InlineKeyboardMarkup:
+    cached = _KEYBOARD_CACHE.get(("support_menu", language))
+    if cached is not None:
+        return cached
+
+    keyboard = (
+        (
+            InlineKeyboardButton(_label("new_ticket", language), callback_data="support_new"),
+            InlineKeyboardButton(_label("my_tickets", language), callback_data="support_tickets"),
+        ),
+        (
+            InlineKeyboardButton(_label("faq", language), callback_data="support_faq"),
+            InlineKeyboardButton(_label("help_center", language), callback_data="support_help"),
+        ),
+        (
+            InlineKeyboardButton(_label("live_chat", language), callback_data="support_chat"),
+            InlineKeyboardButton(_label("email_support", language), callback_data="support_email"),
+        ),
+        _back_to_menu_row(language),
+    )
+    markup = _CachedMarkup(keyboard)
+    _KEYBOARD_CACHE[("support_menu", language)] = markup
+    return markup
+
+
+def support_category_keyboard(language: str = "en") -> InlineKeyboardMarkup:
     """Create support category selection keyboard."""
-    keyboard = [
-        [
-            InlineKeyboardButton(
-                await translate_text("💳 Payment Issues", language),
-                callback_data="support_cat_payment"
-            ),
-            InlineKeyboardButton(
-                await translate_text("📦 Order Problems", language),
-                callback_data="support_cat_order"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("🔧 Technical Issues", language),
-                callback_data="support_cat_technical"
-            ),
-            InlineKeyboardButton(
-                await translate_text("🛍️ Product Questions", language),
-                callback_data="support_cat_product"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("🎁 Refunds & Returns", language),
-                callback_data="support_cat_refund"
-            ),
-            InlineKeyboardButton(
-                await translate_text("📋 Account Issues", language),
-                callback_data="support_cat_account"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("❓ Other", language),
-                callback_data="support_cat_other"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("« Cancel", language),
-                callback_data="support_cancel"
-            )
-        ]
-    ]
-    return InlineKeyboardMarkup(keyboard)
-
-
-async def language_keyboard(current_language: str = "en") -> InlineKeyboardMarkup:
+    cached = _KEYBOARD_CACHE.get(("support_category", language))
+    if cached is not None:
+        return cached
+
+    keyboard = (
+        (
+            InlineKeyboardButton(_label("support_payment", language), callback_data="support_cat_payment"),
+            InlineKeyboardButton(_label("support_order", language), callback_data="support_cat_order"),
+        ),
+        (
+            InlineKeyboardButton(_label("support_technical", language), callback_data="support_cat_technical"),
+            InlineKeyboardButton(_label("support_product", language), callback_data="support_cat_product"),
+        ),
+        (
+            InlineKeyboardButton(_label("support_refund", language), callback_data="support_cat_refund"),
+            InlineKeyboardButton(_label("support_account", language), callback_data="support_cat_account"),
+        ),
+        (
+            InlineKeyboardButton(_label("support_other", language), callback_data="support_cat_other"),
+        ),
+        (
+            InlineKeyboardButton(_label("cancel", language), callback_data="support_cancel"),
+        ),
+    )
+    markup = _CachedMarkup(keyboard)
+    _KEYBOARD_CACHE[("support_category", language)] = markup
+    return markup
+
+
+def language_keyboard(current_language: str = "en") -> InlineKeyboardMarkup:
     """Create language selection keyboard."""
-    languages = [
-        ("🇺🇸 English", "en"),
-        ("🇱🇹 Lietuvių", "lt"),
-        ("🇪🇸 Español", "es"),
-        ("🇫🇷 Français", "fr"),
-        ("🇩🇪 Deutsch", "de"),
-        ("🇷🇺 Русский", "ru")
-    ]
-    
-    keyboard = []
-    for i in range(0, len(languages), 2):
-        row = []
-        for j in range(2):
-            if i + j < len(languages):
-                name, code = languages[i + j]
-                if code == current_language:
-                    name += " ✓"
-                row.append(InlineKeyboardButton(
-                    name,
-                    callback_data=f"language_{code}"
-                ))
-        keyboard.append(row)
-    
-    keyboard.append([
-        InlineKeyboardButton(
-            "« Back to Menu",
-            callback_data="back_to_menu"
-        )
-    ])
-    
-    return InlineKeyboardMarkup(keyboard)
-
+    cached = _KEYBOARD_CACHE.get(("language", current_language))
+    if cached is not None:
+        return cached
 
-async def profile_keyboard(language: str = "en") -> InlineKeyboardMarkup:
-    """Create user profile keyboard."""
+    # Pack languages into rows of 2 by zipping the iterator with itself
+    it = iter(SUPPORTED_LANGUAGES)
     keyboard = [
         [
             InlineKeyboardButton(
-                await translate_text("✏️ Edit Profile", language),
-                callback_data="profile_edit"
-            ),
-            InlineKeyboardButton(
-                await translate_text("🔒 Security", language),
-                callback_data="profile_security"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("💎 Loyalty Points", language),
-                callback_data="profile_loyalty"
-            ),
-            InlineKeyboardButton(
-                await translate_text("🎁 Referrals", language),
-                callback_data="profile_referrals"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("📊 Statistics", language),
-                callback_data="profile_stats"
-            ),
-            InlineKeyboardButton(
-                await translate_text("📱 Notifications", language),
-                callback_data="profile_notifications"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("🗑️ Delete Account", language),
-                callback_data="profile_delete"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("« Back to Menu", language),
-                callback_data="back_to_menu"
+                name + " ✓" if code == current_language else name,
+                callback_data=f"language_{code}"
             )
+            for name, code in pair if code is not None
         ]
+        for pair in zip_longest(it, it, fillvalue=(None, None))
     ]
-    return InlineKeyboardMarkup(keyboard)
 
+    keyboard.append(_back_to_menu_row(current_language))
 
-async def referral_keyboard(language: str = "en") -> InlineKeyboardMarkup:
-    """Create referral program keyboard."""
-    keyboard = [
-        [
-            InlineKeyboardButton(
-                await translate_text("📋 My Referral Code", language),
-                callback_data="referral_code"
-            ),
-            InlineKeyboardButton(
-                await translate_text("📊 Referral Stats", language),
-                callback_data="referral_stats"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("💰 Earnings", language),
-                callback_data="referral_earnings"
-            ),
-            InlineKeyboardButton(
-                await translate_text("👥 My Referrals", language),
-                callback_data="referral_list"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("📤 Share Link", language),
-                callback_data="referral_share"
-            ),
-            InlineKeyboardButton(
-                await translate_text("ℹ️ How it Works", language),
-                callback_data="referral_info"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("« Back to Menu", language),
-                callback_data="back_to_menu"
-            )
-        ]
-    ]
-    return InlineKeyboardMarkup(keyboard)
+    markup = _CachedMarkup(keyboard)
+    _KEYBOARD_CACHE[("language", current_language)] = markup
+    return markup
 
 
-async def promotions_keyboard(language: str = "en") -> InlineKeyboardMarkup:
+def profile_keyboard(language: str = "en") -> InlineKeyboardMarkup:
+    """Create user profile keyboard."""
+    cached = _KEYBOARD_CACHE.get(("profile", language))
+    if cached is not None:
+        return cached
+
+    keyboard = (
+        (
+            InlineKeyboardButton(_label("edit_profile", language), callback_data="profile_edit"),
+            InlineKeyboardButton(_label("security", language), callback_data="profile_security"),
+        ),
+        (
+            InlineKeyboardButton(_label("loyalty_points", language), callback_data="profile_loyalty"),
+            InlineKeyboardButton(_label("referrals", language), callback_data="profile_referrals"),
+        ),
+        (
+            InlineKeyboardButton(_label("statistics", language), callback_data="profile_stats"),
+            InlineKeyboardButton(_label("notifications", language), callback_data="profile_notifications"),
+        ),
+        (
+            InlineKeyboardButton(_label("delete_account", language), callback_data="profile_delete"),
+        ),
+        _back_to_menu_row(language),
+    )
+    markup = _CachedMarkup(keyboard)
+    _KEYBOARD_CACHE[("profile", language)] = markup
+    return markup
+
+
+def referral_keyboard(language: str = "en") -> InlineKeyboardMarkup:
+    """Create referral program keyboard."""
+    cached = _KEYBOARD_CACHE.get(("referral", language))
+    if cached is not None:
+        return cached
+
+    keyboard = (
+        (
+            InlineKeyboardButton(_label("referral_code", language), callback_data="referral_code"),
+            InlineKeyboardButton(_label("referral_stats", language), callback_data="referral_stats"),
+        ),
+        (
+            InlineKeyboardButton(_label("earnings", language), callback_data="referral_earnings"),
+            InlineKeyboardButton(_label("my_referrals", language), callback_data="referral_list"),
+        ),
+        (
+            InlineKeyboardButton(_label("share_link", language), callback_data="referral_share"),
+            InlineKeyboardButton(_label("how_it_works", language), callback_data="referral_info"),
+        ),
+        _back_to_menu_row(language),
+    )
+    markup = _CachedMarkup(keyboard)
+    _KEYBOARD_CACHE[("referral", language)] = markup
+    return markup
+
+
+def promotions_keyboard(language: str = "en") -> InlineKeyboardMarkup:
     """Create promotions keyboard."""
-    keyboard = [
-        [
-            InlineKeyboardButton(
-                await translate_text("🎯 Active Promotions", language),
-                callback_data="promotions_active"
-            ),
-            InlineKeyboardButton(
-                await translate_text("🏷️ Discount Codes", language),
-                callback_data="promotions_codes"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("⭐ Featured Deals", language),
-                callback_data="promotions_featured"
-            ),
-            InlineKeyboardButton(
-                await translate_text("🔥 Flash Sales", language),
-                callback_data="promotions_flash"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("💎 VIP Offers", language),
-                callback_data="promotions_vip"
-            ),
-            InlineKeyboardButton(
-                await translate_text("🎁 Free Items", language),
-                callback_data="promotions_free"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("« Back to Menu", language),
-                callback_data="back_to_menu"
-            )
-        ]
-    ]
-    return InlineKeyboardMarkup(keyboard)
-
-
-async def admin_keyboard(language: str = "en") -> InlineKeyboardMarkup:
+    cached = _KEYBOARD_CACHE.get(("promotions", language))
+    if cached is not None:
+        return cached
+
+    keyboard = (
+        (
+            InlineKeyboardButton(_label("active_promotions", language), callback_data="promotions_active"),
+            InlineKeyboardButton(_label("discount_codes", language), callback_data="promotions_codes"),
+        ),
+        (
+            InlineKeyboardButton(_label("featured_deals", language), callback_data="promotions_featured"),
+            InlineKeyboardButton(_label("flash_sales", language), callback_data="promotions_flash"),
+        ),
+        (
+            InlineKeyboardButton(_label("vip_offers", language), callback_data="promotions_vip"),
+            InlineKeyboardButton(_label("free_items", language), callback_data="promotions_free"),
+        ),
+        _back_to_menu_row(language),
+    )
+    markup = _CachedMarkup(keyboard)
+    _KEYBOARD_CACHE[("promotions", language)] = markup
+    return markup
+
+
+def admin_keyboard(language: str = "en") -> InlineKeyboardMarkup:
     """Create admin control keyboard (for admin users)."""
-    keyboard = [
-        [
-            InlineKeyboardButton(
-                await translate_text("📊 Analytics", language),
-                callback_data="admin_analytics"
-            ),
-            InlineKeyboardButton(
-                await translate_text("👥 Users", language),
-                callback_data="admin_users"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("📦 Orders", language),
-                callback_data="admin_orders"
-            ),
-            InlineKeyboardButton(
-                await translate_text("🛍️ Products", language),
-                callback_data="admin_products"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("💳 Payments", language),
-                callback_data="admin_payments"
-            ),
-            InlineKeyboardButton(
-                await translate_text("🎫 Support", language),
-                callback_data="admin_support"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("⚙️ Settings", language),
-                callback_data="admin_settings"
-            ),
-            InlineKeyboardButton(
-                await translate_text("📱 Broadcast", language),
-                callback_data="admin_broadcast"
-            )
-        ],
-        [
-            InlineKeyboardButton(
-                await translate_text("« Exit Admin", language),
-                callback_data="back_to_menu"
-            )
-        ]
-    ]
-    return InlineKeyboardMarkup(keyboard)
-
-
-# Quick reply keyboards for common actions
-def quick_reply_keyboard(language: str = "en") -> ReplyKeyboardMarkup:
-    """Create quick reply keyboard for common actions."""
-    keyboard = [
+    cached = _KEYBOARD_CACHE.get(("admin", language))
+    if cached is not None:
+        return cached
+
+    keyboard = (
+        (
+            InlineKeyboardButton(_label("admin_analytics", language), callback_data="admin_analytics"),
+            InlineKeyboardButton(_label("admin_users", language), callback_data="admin_users"),
+        ),
+        (
+            InlineKeyboardButton(_label("admin_orders", language), callback_data="admin_orders"),
+            InlineKeyboardButton(_label("admin_products", language), callback_data="admin_products"),
+        ),
+        (
+            InlineKeyboardButton(_label("admin_payments", language), callback_data="admin_payments"),
+            InlineKeyboardButton(_label("admin_support", language), callback_data="admin_support"),
+        ),
+        (
+            InlineKeyboardButton(_label("admin_settings", language), callback_data="admin_settings"),
+            InlineKeyboardButton(_label("admin_broadcast", language), callback_data="admin_broadcast"),
+        ),
+        (
+            InlineKeyboardButton(_label("exit_admin", language), callback_data=CB_BACK_TO_MENU),
+        ),
+    )
+    markup = _CachedMarkup(keyboard)
+    _KEYBOARD_CACHE[("admin", language)] = markup
+    return markup
+
+
+# Quick reply keyboard is identical for every call, so it is built once
+# at import time
+_QUICK_REPLY_MARKUP = ReplyKeyboardMarkup(
+    [
         [
             KeyboardButton("🛍️ Shop"),
             KeyboardButton("🛒 Cart"),
@@ -656,9 +712,21 @@ def quick_reply_keyboard(language: str = "en") -> ReplyKeyboardMarkup:
             KeyboardButton("👤 Profile"),
             KeyboardButton("ℹ️ Help")
         ]
-    ]
-    return ReplyKeyboardMarkup(
-        keyboard,
-        resize_keyboard=True,
-        one_time_keyboard=False
-    )
\ No newline at end of file
+    ],
+    resize_keyboard=True,
+    one_time_keyboard=False
+)
+
+
+def quick_reply_keyboard(language: str = "en") -> ReplyKeyboardMarkup:
+    """Create quick reply keyboard for common actions."""
+    return _QUICK_REPLY_MARKUP
+
+
+# Builders whose layout is constant per language, warmed at startup
+_STATIC_KEYBOARDS = (
+    main_menu_keyboard, cart_keyboard, payment_keyboard,
+    order_history_keyboard, support_menu_keyboard, support_category_keyboard,
+    language_keyboard, profile_keyboard, referral_keyboard,
+    promotions_keyboard, admin_keyboard,
+)
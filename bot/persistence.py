@@ -0,0 +1,115 @@
+"""
+Redis-backed persistence for python-telegram-bot.
+"""
+import pickle
+from typing import Any, Dict, Optional, Tuple
+
+from telegram.ext import BasePersistence, PersistenceInput
+from redis import asyncio as aioredis
+from loguru import logger
+
+
+class RedisPersistence(BasePersistence):
+    """
+    Store bot/user/chat/conversation data in Redis.
+
+    Conversation state (support tickets etc.) survives restarts and is
+    shared between horizontally scaled bot workers, unlike the previous
+    in-process dict.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        key_prefix: str = "ptb",
+        store_data: Optional[PersistenceInput] = None,
+        update_interval: float = 60,
+    ):
+        super().__init__(store_data=store_data, update_interval=update_interval)
+        self.redis = aioredis.from_url(url)
+        self.key_prefix = key_prefix
+
+    def _key(self, *parts) -> str:
+        """Build a namespaced Redis key."""
+        return ":".join((self.key_prefix,) + tuple(str(part) for part in parts))
+
+    @staticmethod
+    def _dumps(value: Any) -> bytes:
+        return pickle.dumps(value)
+
+    @staticmethod
+    def _loads(raw: Optional[bytes]) -> Any:
+        return pickle.loads(raw) if raw is not None else None
+
+    # Bot data
+
+    async def get_bot_data(self) -> Dict[Any, Any]:
+        data = self._loads(await self.redis.get(self._key("bot_data")))
+        return data or {}
+
+    async def update_bot_data(self, data: Dict[Any, Any]) -> None:
+        await self.redis.set(self._key("bot_data"), self._dumps(data))
+
+    async def refresh_bot_data(self, bot_data: Dict[Any, Any]) -> None:
+        pass
+
+    # Chat data
+
+    async def get_chat_data(self) -> Dict[int, Dict[Any, Any]]:
+        raw = await self.redis.hgetall(self._key("chat_data"))
+        return {int(chat_id): self._loads(data) for chat_id, data in raw.items()}
+
+    async def update_chat_data(self, chat_id: int, data: Dict[Any, Any]) -> None:
+        await self.redis.hset(self._key("chat_data"), chat_id, self._dumps(data))
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        await self.redis.hdel(self._key("chat_data"), chat_id)
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: Dict[Any, Any]) -> None:
+        pass
+
+    # User data
+
+    async def get_user_data(self) -> Dict[int, Dict[Any, Any]]:
+        raw = await self.redis.hgetall(self._key("user_data"))
+        return {int(user_id): self._loads(data) for user_id, data in raw.items()}
+
+    async def update_user_data(self, user_id: int, data: Dict[Any, Any]) -> None:
+        await self.redis.hset(self._key("user_data"), user_id, self._dumps(data))
+
+    async def drop_user_data(self, user_id: int) -> None:
+        await self.redis.hdel(self._key("user_data"), user_id)
+
+    async def refresh_user_data(self, user_id: int, user_data: Dict[Any, Any]) -> None:
+        pass
+
+    # Callback data
+
+    async def get_callback_data(self) -> Optional[Any]:
+        return self._loads(await self.redis.get(self._key("callback_data")))
+
+    async def update_callback_data(self, data: Any) -> None:
+        await self.redis.set(self._key("callback_data"), self._dumps(data))
+
+    # Conversations
+
+    async def get_conversations(self, name: str) -> Dict[Tuple, object]:
+        raw = await self.redis.hgetall(self._key("conv", name))
+        return {
+            self._loads(key): self._loads(state)
+            for key, state in raw.items()
+        }
+
+    async def update_conversation(self, name: str, key: Tuple, new_state: Optional[object]) -> None:
+        if new_state is None:
+            await self.redis.hdel(self._key("conv", name), self._dumps(key))
+        else:
+            await self.redis.hset(
+                self._key("conv", name), self._dumps(key), self._dumps(new_state)
+            )
+
+    async def flush(self) -> None:
+        try:
+            await self.redis.aclose()
+        except Exception as e:
+            logger.error(f"Error closing persistence Redis connection: {e}")
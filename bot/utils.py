@@ -1,12 +1,22 @@
 """
 Utility functions for the Telegram shop bot.
 """
-import uuid
-import hashlib
+import asyncio
+import re
+import secrets
+import sys
+import time
+from bisect import bisect_left
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Optional, Dict, Any, List
 from telegram import User as TelegramUser
 from loguru import logger
+from cachetools import TTLCache
+from sqlalchemy import bindparam, select
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from database.database import SessionLocal
 from database.models import User, Product, Order, UserRole, ProductType
@@ -14,6 +24,10 @@ from config.settings import get_settings
 
 settings = get_settings()
 
+# Compiled once at import; validate_email then skips re's internal
+# pattern-cache lookup on every call
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 # Simple translation dictionary (in production, use proper i18n)
 TRANSLATIONS = {
     "en": {
@@ -89,70 +103,118 @@ TRANSLATIONS = {
 }
 
 
+# Translation table flattened to one dict keyed by (language, text): a
+# single probe per lookup instead of two nested ones. Keys and values are
+# interned once at import so repeated lookups compare pointers instead of
+# hashing whole strings.
+_FLAT_TRANSLATIONS = {
+    (sys.intern(lang), sys.intern(k)): sys.intern(v)
+    for lang, table in TRANSLATIONS.items()
+    for k, v in table.items()
+}
+
+
+def _translate(text: str, language: str) -> str:
+    """Resolve a translation; a single flat-dict probe."""
+    return _FLAT_TRANSLATIONS.get((language, text), text)
+
+
 async def translate_text(text: str, language: str = "en") -> str:
     """
     Translate text to specified language.
     """
-    try:
-        if language in TRANSLATIONS and text in TRANSLATIONS[language]:
-            return TRANSLATIONS[language][text]
-        return text
-    except Exception as e:
-        logger.error(f"Translation error: {e}")
+    # Source strings are already English; the default locale needs no
+    # lookup or caching at all
+    if language == "en":
         return text
 
+    return _translate(text, language)
+
+
+# Short-TTL cache of resolved User rows keyed by Telegram user id. Every
+# handler starts with get_or_create_user, making it the most frequent query
+# in the bot; the cache removes that round trip for active users.
+_user_cache: Dict[int, tuple] = {}
+_USER_CACHE_TTL = 300  # seconds
+_USER_CACHE_MAX = 100_000
+
+
+def invalidate_user_cache(telegram_id: int) -> None:
+    """
+    Drop a cached user row (call after language/profile changes).
+    """
+    _user_cache.pop(telegram_id, None)
+
 
 async def get_or_create_user(telegram_user: TelegramUser) -> User:
     """
     Get existing user or create new one from Telegram user data.
     """
+    now = datetime.now(timezone.utc).timestamp()
+    cached = _user_cache.get(telegram_user.id)
+    if cached and now - cached[1] < _USER_CACHE_TTL:
+        return cached[0]
+
+    # The upsert runs on the sync engine; keep it off the event loop so
+    # a cache miss doesn't stall every other handler
+    user = await asyncio.to_thread(_fetch_or_create_user, telegram_user)
+
+    if len(_user_cache) >= _USER_CACHE_MAX:
+        _user_cache.clear()
+    _user_cache[telegram_user.id] = (user, now)
+    return user
+
+
+# Pick the dialect-specific INSERT so ON CONFLICT upserts compile on both
+# the production Postgres database and the SQLite development database
+_dialect_insert = (
+    pg_insert
+    if settings.database_url_sync.startswith("postgresql")
+    else sqlite_insert
+)
+
+
+def _fetch_or_create_user(telegram_user: TelegramUser) -> User:
+    """
+    Load the user row from the database, creating it on first contact
+    (sync, threaded by get_or_create_user).
+
+    A single INSERT ... ON CONFLICT DO UPDATE ... RETURNING replaces the
+    previous SELECT / compare / UPDATE sequence: one round-trip per update
+    and no read-modify-write race between workers.
+    """
     db = SessionLocal()
     try:
-        # Try to find existing user
-        user = db.query(User).filter(
-            User.telegram_id == str(telegram_user.id)
-        ).first()
-        
-        if user:
-            # Update user info if changed
-            updated = False
-            if user.username != telegram_user.username:
-                user.username = telegram_user.username
-                updated = True
-            if user.first_name != telegram_user.first_name:
-                user.first_name = telegram_user.first_name
-                updated = True
-            if user.last_name != telegram_user.last_name:
-                user.last_name = telegram_user.last_name
-                updated = True
-            
-            if updated:
-                user.updated_at = datetime.now(timezone.utc)
-                db.commit()
-            
-            return user
-        
-        # Create new user
-        referral_code = generate_referral_code(telegram_user.id)
-        
-        user = User(
-            telegram_id=str(telegram_user.id),
-            username=telegram_user.username,
-            first_name=telegram_user.first_name,
-            last_name=telegram_user.last_name,
-            language=telegram_user.language_code or "en",
-            referral_code=referral_code,
-            role=UserRole.CUSTOMER,
-            is_active=True
+        stmt = (
+            _dialect_insert(User)
+            .values(
+                telegram_id=str(telegram_user.id),
+                username=telegram_user.username,
+                first_name=telegram_user.first_name,
+                last_name=telegram_user.last_name,
+                language=telegram_user.language_code or "en",
+                referral_code=generate_referral_code(telegram_user.id),
+                role=UserRole.CUSTOMER,
+                is_active=True,
+            )
+            .on_conflict_do_update(
+                index_elements=["telegram_id"],
+                set_=dict(
+                    username=telegram_user.username,
+                    first_name=telegram_user.first_name,
+                    last_name=telegram_user.last_name,
+                    updated_at=func.now(),
+                ),
+            )
+            .returning(User)
         )
-        
-        db.add(user)
+        user = db.scalars(stmt).one()
+        # Detach before commit so the returned row's attributes stay loaded
+        # after the session closes
+        db.expunge(user)
         db.commit()
-        db.refresh(user)
-        
-        logger.info(f"Created new user: {user.telegram_id}")
         return user
-        
+
     except Exception as e:
         logger.error(f"Error getting/creating user: {e}")
         db.rollback()
@@ -165,10 +227,30 @@ def generate_referral_code(telegram_id: int) -> str:
     """
     Generate unique referral code for user.
     """
-    # Create a hash of telegram_id + timestamp
-    data = f"{telegram_id}_{datetime.now().timestamp()}"
-    hash_object = hashlib.md5(data.encode())
-    return f"REF{hash_object.hexdigest()[:8].upper()}"
+    # 32 bits of CSPRNG entropy; uniqueness is backed by the DB index.
+    # telegram_id is kept for API compatibility but no longer mixed in.
+    return f"REF{secrets.token_hex(4).upper()}"
+
+
+# Dispatch tables for message formatting, built once at import instead of
+# per call. Status keys are interned so the Enum .value lookup resolves by
+# pointer comparison.
+_STATUS_EMOJI = {sys.intern(k): v for k, v in {
+    "pending": "⏳",
+    "paid": "💰",
+    "processing": "🔄",
+    "shipped": "🚚",
+    "delivered": "✅",
+    "cancelled": "❌",
+    "refunded": "💸",
+}.items()}
+
+_TYPE_EMOJI = {ProductType.DIGITAL: "💾", ProductType.PHYSICAL: "📦"}
+_TYPE_LABEL = {ProductType.DIGITAL: "Digital", ProductType.PHYSICAL: "Physical"}
+
+# Shipping-address keys, interned so the per-order dict probes compare
+# pointers instead of hashing the literals each render
+_ADDR_KEYS = tuple(sys.intern(k) for k in ("street", "city", "state", "zip", "country"))
 
 
 async def format_product_message(product: Product, language: str = "en") -> str:
@@ -176,70 +258,73 @@ async def format_product_message(product: Product, language: str = "en") -> str:
     Format product details message.
     """
     try:
-        # Product title and price
-        message = f"🛍️ <b>{product.name}</b>\n"
-        message += f"💰 <b>${product.price:.2f}</b>"
-        
+        # Collect fragments and join once: O(n) total copying instead of a
+        # reallocation per +=
+        parts = []
+
+        # Product title and price (escaped once: the message is HTML-parsed)
+        parts.append(f"🛍️ <b>{escape_html(product.name)}</b>\n")
+        parts.append(f"💰 <b>${product.price:.2f}</b>")
+
         # Show compare price if different
         if product.compare_price and product.compare_price > product.price:
             savings = product.compare_price - product.price
-            message += f" <s>${product.compare_price:.2f}</s>"
-            message += f" (Save ${savings:.2f}!)"
-        
-        message += "\n\n"
-        
+            parts.append(f" <s>${product.compare_price:.2f}</s> (Save ${savings:.2f}!)")
+
+        parts.append("\n\n")
+
         # Product description
         if product.description:
-            message += f"📝 {product.description}\n\n"
-        
+            parts.append(f"📝 {escape_html(product.description)}\n\n")
+
         # Product type
-        type_emoji = "💾" if product.product_type == ProductType.DIGITAL else "📦"
-        product_type = "Digital" if product.product_type == ProductType.DIGITAL else "Physical"
-        message += f"{type_emoji} <b>Type:</b> {product_type}\n"
-        
+        type_emoji = _TYPE_EMOJI.get(product.product_type, "📦")
+        product_type = _TYPE_LABEL.get(product.product_type, "Physical")
+        parts.append(f"{type_emoji} <b>Type:</b> {product_type}\n")
+
         # Stock information
         if product.track_inventory:
             if product.stock_quantity > 0:
                 if product.stock_quantity <= product.low_stock_threshold:
-                    message += f"⚠️ <b>Stock:</b> Only {product.stock_quantity} left!\n"
+                    parts.append(f"⚠️ <b>Stock:</b> Only {product.stock_quantity} left!\n")
                 else:
-                    message += f"✅ <b>Stock:</b> {product.stock_quantity} available\n"
+                    parts.append(f"✅ <b>Stock:</b> {product.stock_quantity} available\n")
             else:
-                message += f"❌ <b>Stock:</b> Out of stock\n"
+                parts.append("❌ <b>Stock:</b> Out of stock\n")
         else:
-            message += f"♾️ <b>Stock:</b> Unlimited\n"
-        
+            parts.append("♾️ <b>Stock:</b> Unlimited\n")
+
         # SKU
         if product.sku:
-            message += f"🔖 <b>SKU:</b> {product.sku}\n"
-        
+            parts.append(f"🔖 <b>SKU:</b> {escape_html(product.sku)}\n")
+
         # Views
         if product.view_count > 0:
-            message += f"👁️ <b>Views:</b> {product.view_count}\n"
-        
+            parts.append(f"👁️ <b>Views:</b> {product.view_count}\n")
+
         # Purchase count
         if product.purchase_count > 0:
-            message += f"🛒 <b>Sold:</b> {product.purchase_count} times\n"
-        
+            parts.append(f"🛒 <b>Sold:</b> {product.purchase_count} times\n")
+
         # Digital product specific info
         if product.product_type == ProductType.DIGITAL:
             if product.download_limit:
-                message += f"📥 <b>Download limit:</b> {product.download_limit}\n"
+                parts.append(f"📥 <b>Download limit:</b> {product.download_limit}\n")
             if product.download_expiry_days:
-                message += f"⏰ <b>Download expires:</b> {product.download_expiry_days} days\n"
-        
+                parts.append(f"⏰ <b>Download expires:</b> {product.download_expiry_days} days\n")
+
         # Physical product specific info
         if product.product_type == ProductType.PHYSICAL:
             if product.weight:
-                message += f"⚖️ <b>Weight:</b> {product.weight}kg\n"
+                parts.append(f"⚖️ <b>Weight:</b> {product.weight}kg\n")
             if all([product.length, product.width, product.height]):
-                message += f"📏 <b>Dimensions:</b> {product.length}×{product.width}×{product.height}cm\n"
-        
-        return message
+                parts.append(f"📏 <b>Dimensions:</b> {product.length}×{product.width}×{product.height}cm\n")
+
+        return "".join(parts)
         
     except Exception as e:
         logger.error(f"Error formatting product message: {e}")
-        return f"🛍️ <b>{product.name}</b>\n💰 <b>${product.price:.2f}</b>"
+        return f"🛍️ <b>{escape_html(product.name)}</b>\n💰 <b>${product.price:.2f}</b>"
 
 
 async def format_order_message(order: Order, language: str = "en") -> str:
@@ -247,67 +332,58 @@ async def format_order_message(order: Order, language: str = "en") -> str:
     Format order details message.
     """
     try:
-        message = f"📦 <b>Order #{order.order_number}</b>\n\n"
-        
+        # Collect fragments and join once: O(n) total copying instead of a
+        # reallocation per +=
+        parts = [f"📦 <b>Order #{order.order_number}</b>\n\n"]
+
         # Order status
-        status_emoji = {
-            "pending": "⏳",
-            "paid": "💰",
-            "processing": "🔄",
-            "shipped": "🚚",
-            "delivered": "✅",
-            "cancelled": "❌",
-            "refunded": "💸"
-        }
-        
-        emoji = status_emoji.get(order.status.value, "📦")
-        message += f"{emoji} <b>Status:</b> {order.status.value.title()}\n"
-        
+        emoji = _STATUS_EMOJI.get(order.status.value, "📦")
+        parts.append(f"{emoji} <b>Status:</b> {order.status.value.title()}\n")
+
         # Order date
-        message += f"📅 <b>Date:</b> {order.created_at.strftime('%Y-%m-%d %H:%M')}\n"
-        
+        parts.append(f"📅 <b>Date:</b> {order.created_at.strftime('%Y-%m-%d %H:%M')}\n")
+
         # Payment information
-        message += f"💳 <b>Payment:</b> {order.payment_method or 'Cryptocurrency'}\n"
-        message += f"💰 <b>Total:</b> ${order.total_amount:.2f} {order.currency}\n\n"
-        
+        parts.append(f"💳 <b>Payment:</b> {order.payment_method or 'Cryptocurrency'}\n")
+        parts.append(f"💰 <b>Total:</b> ${order.total_amount:.2f} {order.currency}\n\n")
+
         # Order items
-        message += "<b>Items:</b>\n"
+        parts.append("<b>Items:</b>\n")
         for item in order.items:
-            message += f"• {item.product_name}\n"
-            message += f"  Qty: {item.quantity} × ${item.unit_price:.2f} = ${item.total_price:.2f}\n"
-        
+            parts.append(f"• {escape_html(item.product_name)}\n")
+            parts.append(f"  Qty: {item.quantity} × ${item.unit_price:.2f} = ${item.total_price:.2f}\n")
+
         # Subtotal and fees
-        message += f"\n<b>Subtotal:</b> ${order.subtotal:.2f}\n"
-        
+        parts.append(f"\n<b>Subtotal:</b> ${order.subtotal:.2f}\n")
+
         if order.discount_amount > 0:
-            message += f"<b>Discount:</b> -${order.discount_amount:.2f}\n"
-        
+            parts.append(f"<b>Discount:</b> -${order.discount_amount:.2f}\n")
+
         if order.tax_amount > 0:
-            message += f"<b>Tax:</b> ${order.tax_amount:.2f}\n"
-        
+            parts.append(f"<b>Tax:</b> ${order.tax_amount:.2f}\n")
+
         if order.shipping_amount > 0:
-            message += f"<b>Shipping:</b> ${order.shipping_amount:.2f}\n"
-        
-        message += f"<b>Total:</b> ${order.total_amount:.2f}\n"
-        
+            parts.append(f"<b>Shipping:</b> ${order.shipping_amount:.2f}\n")
+
+        parts.append(f"<b>Total:</b> ${order.total_amount:.2f}\n")
+
         # Shipping information
         if order.shipping_address:
-            message += f"\n📍 <b>Shipping Address:</b>\n"
+            parts.append("\n📍 <b>Shipping Address:</b>\n")
             addr = order.shipping_address
             if isinstance(addr, dict):
-                message += f"{addr.get('street', '')}\n"
-                message += f"{addr.get('city', '')}, {addr.get('state', '')} {addr.get('zip', '')}\n"
-                message += f"{addr.get('country', '')}\n"
-        
+                street, city, state, zip_code, country = (addr.get(k, "") for k in _ADDR_KEYS)
+                parts.append(f"{street}\n{city}, {state} {zip_code}\n{country}\n")
+
         # Tracking information
         if order.tracking_number:
-            message += f"\n📦 <b>Tracking:</b> {order.tracking_number}\n"
-        
+            parts.append(f"\n📦 <b>Tracking:</b> {order.tracking_number}\n")
+
         # Customer notes
         if order.customer_notes:
-            message += f"\n📝 <b>Notes:</b> {order.customer_notes}\n"
-        
-        return message
+            parts.append(f"\n📝 <b>Notes:</b> {escape_html(order.customer_notes)}\n")
+
+        return "".join(parts)
         
     except Exception as e:
         logger.error(f"Error formatting order message: {e}")
@@ -319,24 +395,34 @@ def calculate_order_total(items: List[Dict[str, Any]], discount_code: Optional[s
     Calculate order totals including discounts, tax, and shipping.
     """
     try:
-        subtotal = sum(item["price"] * item["quantity"] for item in items)
+        # One pass over the cart collects subtotal, physical-item flag and
+        # total weight together instead of three separate walks
+        subtotal = 0.0
+        has_physical_items = False
+        total_weight = 0.0
+        for item in items:
+            quantity = item["quantity"]
+            subtotal += item["price"] * quantity
+            if item.get("requires_shipping"):
+                has_physical_items = True
+            total_weight += (item.get("weight") or 0) * quantity
+
         discount_amount = 0.0
         tax_amount = 0.0
         shipping_amount = 0.0
-        
+
         # Apply discount code
         if discount_code:
             discount_amount = calculate_discount(subtotal, discount_code)
-        
+
         # Calculate tax (implement based on business rules)
         taxable_amount = subtotal - discount_amount
         tax_rate = 0.0  # Set based on location/product type
         tax_amount = taxable_amount * tax_rate
-        
+
         # Calculate shipping (implement based on business rules)
-        has_physical_items = any(item.get("requires_shipping", False) for item in items)
         if has_physical_items:
-            shipping_amount = calculate_shipping(items)
+            shipping_amount = _shipping_from_weight(total_weight)
         
         total_amount = subtotal - discount_amount + tax_amount + shipping_amount
         
@@ -359,77 +445,131 @@ def calculate_order_total(items: List[Dict[str, Any]], discount_code: Optional[s
         }
 
 
+# Resolved discount amounts keyed by (code, rounded subtotal). A checkout
+# flow recomputes the cart repeatedly with the same code; the short TTL
+# keeps those recomputes off the database without serving stale codes for
+# long. Codes whose usage limit is nearly exhausted are never cached so a
+# just-spent code can't appear valid.
+_DISCOUNT_CACHE = TTLCache(maxsize=1024, ttl=60)
+_DISCOUNT_USAGE_HEADROOM = 5
+
+# Built once at import: executing the same statement object keeps its key
+# stable in SQLAlchemy's compiled-statement cache, skipping Core-to-SQL
+# compilation on the hot path
+_DISCOUNT_BY_CODE_STMT = None
+
+
+def _discount_stmt():
+    """Lazily build the shared DiscountCode lookup statement."""
+    global _DISCOUNT_BY_CODE_STMT
+    if _DISCOUNT_BY_CODE_STMT is None:
+        from database.models import DiscountCode
+        _DISCOUNT_BY_CODE_STMT = select(DiscountCode).where(
+            DiscountCode.code == bindparam("code"),
+            DiscountCode.is_active == True
+        )
+    return _DISCOUNT_BY_CODE_STMT
+
+
+def invalidate_discount_cache():
+    """Drop cached discount results (call after admin edits a code)."""
+    _DISCOUNT_CACHE.clear()
+
+
 def calculate_discount(subtotal: float, discount_code: str) -> float:
     """
     Calculate discount amount based on discount code.
     """
     try:
+        code = discount_code.upper()
+        cache_key = (code, round(subtotal, 2))
+        cached = _DISCOUNT_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
         db = SessionLocal()
         try:
-            from database.models import DiscountCode
-            
-            discount = db.query(DiscountCode).filter(
-                DiscountCode.code == discount_code.upper(),
-                DiscountCode.is_active == True
+            discount = db.scalars(
+                _discount_stmt(), {"code": code}
             ).first()
-            
-            if not discount:
-                return 0.0
-            
-            # Check validity dates
-            now = datetime.now(timezone.utc)
-            if discount.valid_from and now < discount.valid_from:
-                return 0.0
-            if discount.valid_until and now > discount.valid_until:
-                return 0.0
-            
-            # Check minimum amount
-            if discount.minimum_amount and subtotal < discount.minimum_amount:
-                return 0.0
-            
-            # Check usage limits
-            if discount.usage_limit and discount.current_usage >= discount.usage_limit:
-                return 0.0
-            
-            # Calculate discount
-            if discount.type == "percentage":
-                discount_amount = subtotal * (discount.value / 100)
-            elif discount.type == "fixed_amount":
-                discount_amount = discount.value
-            else:
-                return 0.0
-            
-            # Apply maximum discount limit
-            if discount.maximum_amount:
-                discount_amount = min(discount_amount, discount.maximum_amount)
-            
-            return min(discount_amount, subtotal)  # Don't exceed subtotal
-            
+
+            amount = _resolve_discount_amount(discount, subtotal)
+
+            # Cache unless the remaining uses are low enough that a stale
+            # "valid" answer could oversell the code
+            if not (
+                discount
+                and discount.usage_limit
+                and discount.usage_limit - discount.current_usage <= _DISCOUNT_USAGE_HEADROOM
+            ):
+                _DISCOUNT_CACHE[cache_key] = amount
+            return amount
+
         finally:
             db.close()
-            
+
     except Exception as e:
         logger.error(f"Error calculating discount: {e}")
         return 0.0
 
 
+def _resolve_discount_amount(discount, subtotal: float) -> float:
+    """Apply a DiscountCode row's rules to a subtotal."""
+    if not discount:
+        return 0.0
+
+    # Check validity dates
+    now = datetime.now(timezone.utc)
+    if discount.valid_from and now < discount.valid_from:
+        return 0.0
+    if discount.valid_until and now > discount.valid_until:
+        return 0.0
+
+    # Check minimum amount
+    if discount.minimum_amount and subtotal < discount.minimum_amount:
+        return 0.0
+
+    # Check usage limits
+    if discount.usage_limit and discount.current_usage >= discount.usage_limit:
+        return 0.0
+
+    # Calculate discount
+    if discount.type == "percentage":
+        discount_amount = subtotal * (discount.value / 100)
+    elif discount.type == "fixed_amount":
+        discount_amount = discount.value
+    else:
+        return 0.0
+
+    # Apply maximum discount limit
+    if discount.maximum_amount:
+        discount_amount = min(discount_amount, discount.maximum_amount)
+
+    return min(discount_amount, subtotal)  # Don't exceed subtotal
+
+
+# Shipping fee tiers: weight bound (inclusive) -> fee, resolved with one
+# bisect instead of an if/elif ladder
+_SHIP_BOUNDS = (1.0, 5.0)
+_SHIP_FEES = (5.0, 10.0, 15.0)
+
+
+def _shipping_from_weight(total_weight: float) -> float:
+    """Map an already-summed cart weight to its shipping fee."""
+    if total_weight <= 0:
+        return 0.0
+    return _SHIP_FEES[bisect_left(_SHIP_BOUNDS, total_weight)]
+
+
 def calculate_shipping(items: List[Dict[str, Any]]) -> float:
     """
     Calculate shipping cost based on items.
     """
     try:
         # Simple shipping calculation - implement based on business rules
-        total_weight = sum(item.get("weight", 0) * item["quantity"] for item in items)
-        
-        if total_weight <= 0:
-            return 0.0
-        elif total_weight <= 1:
-            return 5.0
-        elif total_weight <= 5:
-            return 10.0
-        else:
-            return 15.0
-            
+        total_weight = sum((item.get("weight") or 0) * item["quantity"] for item in items)
+        return _shipping_from_weight(total_weight)
+
     except Exception as e:
         logger.error(f"Error calculating shipping: {e}")
         return 0.0
@@ -442,22 +582,30 @@ def get_user_language(user: User) -> str:
     return user.language if user.language in settings.supported_languages else settings.default_language
 
 
+@lru_cache(maxsize=64)
+def _currency_template(currency: str) -> str:
+    """Format-string template for a currency code, built once per code."""
+    code = currency.upper()
+    return "${:.2f}" if code == "USD" else "{:.2f} " + code
+
+
 def format_currency(amount: float, currency: str = "USD") -> str:
     """
     Format currency amount for display.
     """
     try:
-        if currency.upper() == "USD":
-            return f"${amount:.2f}"
-        else:
-            return f"{amount:.2f} {currency.upper()}"
+        return _currency_template(currency).format(amount)
     except Exception:
         return f"{amount:.2f}"
 
 
+@lru_cache(maxsize=2048)
 def truncate_text(text: str, max_length: int = 100) -> str:
     """
     Truncate text to specified length.
+
+    Product names repeat across listing renders, so results are memoized;
+    call truncate_text.cache_clear() after bulk catalog edits.
     """
     if len(text) <= max_length:
         return text
@@ -482,59 +630,125 @@ def validate_email(email: str) -> bool:
     """
     Validate email address format.
     """
-    import re
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return _EMAIL_RE.match(email) is not None
+
+
+# Minute-granularity prefix for order numbers, re-rendered only when the
+# minute changes; during a flash sale every order in the same minute reuses
+# the cached strftime result
+_order_prefix_minute = -1
+_order_prefix = ""
 
 
 def generate_order_number() -> str:
     """
     Generate unique order number.
     """
-    timestamp = datetime.now().strftime('%Y%m%d%H%M')
-    random_part = uuid.uuid4().hex[:6].upper()
-    return f"ORD-{timestamp}-{random_part}"
+    global _order_prefix_minute, _order_prefix
+    minute = int(time.time()) // 60
+    if minute != _order_prefix_minute:
+        _order_prefix = time.strftime('%Y%m%d%H%M', time.gmtime())
+        _order_prefix_minute = minute
+    return f"ORD-{_order_prefix}-{secrets.token_hex(3).upper()}"
+
+
+# Keys of the dict parse_callback_data returns, interned once so every
+# parsed callback shares the same key objects
+_CB_ACTION = sys.intern("action")
+_CB_TYPE = sys.intern("type")
+_CB_PARAMS = sys.intern("params")
 
 
 def parse_callback_data(callback_data: str) -> Dict[str, str]:
     """
     Parse callback data into components.
     """
-    try:
-        parts = callback_data.split("_")
-        if len(parts) >= 2:
-            return {
-                "action": parts[0],
-                "type": parts[1],
-                "params": parts[2:] if len(parts) > 2 else []
-            }
-        return {"action": callback_data, "type": "", "params": []}
-    except Exception:
-        return {"action": callback_data, "type": "", "params": []}
+    # partition allocates at most three substrings for the common
+    # action_type case, where split built a full list every call
+    action, sep, rest = callback_data.partition("_")
+    if not sep:
+        return {_CB_ACTION: callback_data, _CB_TYPE: "", _CB_PARAMS: []}
+    data_type, sep, tail = rest.partition("_")
+    return {
+        _CB_ACTION: action,
+        _CB_TYPE: data_type,
+        _CB_PARAMS: tail.split("_") if sep else [],
+    }
+
+
+# Activity events buffered for batched insertion. A single-row INSERT plus
+# COMMIT per click churns the connection pool; the flush loop drains the
+# queue every ACTIVITY_FLUSH_DELAY seconds with one bulk insert instead.
+_activity_queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+ACTIVITY_FLUSH_DELAY = 0.5  # seconds
+ACTIVITY_BATCH_MAX = 500
 
 
 async def log_user_activity(user: User, action: str, details: Optional[Dict[str, Any]] = None):
     """
     Log user activity for analytics.
+
+    Events are queued and written in batches by activity_flush_loop.
     """
     try:
-        from database.models import ActivityLog
-        
+        _activity_queue.put_nowait({
+            "user_id": user.id,
+            "action": action,
+            "details": details or {},
+            "created_at": datetime.now(timezone.utc),
+        })
+    except Exception as e:
+        logger.error(f"Error logging user activity: {e}")
+
+
+async def activity_flush_loop():
+    """Drain queued activity events into batched bulk inserts."""
+    while True:
+        batch = [await _activity_queue.get()]
+        await asyncio.sleep(ACTIVITY_FLUSH_DELAY)
+        while not _activity_queue.empty() and len(batch) < ACTIVITY_BATCH_MAX:
+            batch.append(_activity_queue.get_nowait())
+        # The insert runs on the sync engine; keep it off the event loop
+        # so handlers aren't stalled behind the flush
+        await asyncio.to_thread(_flush_activity_batch, batch)
+
+
+def flush_pending_activity():
+    """Write any still-queued activity events (called at shutdown)."""
+    batch = []
+    while not _activity_queue.empty():
+        batch.append(_activity_queue.get_nowait())
+    if batch:
+        _flush_activity_batch(batch)
+
+
+def _flush_activity_batch(batch: List[Dict[str, Any]]):
+    """Insert a batch of activity rows in one executemany statement."""
+    from sqlalchemy import insert
+    from database.models import ActivityLog
+
+    try:
         db = SessionLocal()
         try:
-            activity = ActivityLog(
-                user_id=user.id,
-                action=action,
-                details=details or {},
-                created_at=datetime.now(timezone.utc)
-            )
-            db.add(activity)
+            # 2.0-style executemany rides the engine's insertmanyvalues
+            # paging, batching the whole flush into few round-trips
+            db.execute(insert(ActivityLog), batch)
             db.commit()
         finally:
             db.close()
-            
     except Exception as e:
-        logger.error(f"Error logging user activity: {e}")
+        logger.error(f"Error flushing activity log batch: {e}")
+
+
+# Translation table escaping all five HTML special characters in a single
+# C-level pass instead of five chained .replace scans
+_HTML_ESCAPE = str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+    "'": "&#x27;",
+})
 
 
 def escape_html(text: str) -> str:
@@ -542,24 +756,24 @@ def escape_html(text: str) -> str:
     Escape HTML special characters for Telegram messages.
     """
     try:
-        return (text
-                .replace("&", "&amp;")
-                .replace("<", "&lt;")
-                .replace(">", "&gt;")
-                .replace('"', "&quot;")
-                .replace("'", "&#x27;"))
+        return text.translate(_HTML_ESCAPE)
     except Exception:
         return str(text)
 
 
+# Per-language datetime formats, keyed by interned language codes so the
+# lookup is a pointer-equal probe
+_DT_FMT = {
+    sys.intern("lt"): "%Y-%m-%d %H:%M",
+    sys.intern("en"): "%m/%d/%Y %I:%M %p",
+}
+
+
 def format_datetime(dt: datetime, language: str = "en") -> str:
     """
     Format datetime for display in user's language.
     """
     try:
-        if language == "lt":
-            return dt.strftime("%Y-%m-%d %H:%M")
-        else:
-            return dt.strftime("%m/%d/%Y %I:%M %p")
+        return dt.strftime(_DT_FMT.get(language, _DT_FMT["en"]))
     except Exception:
         return str(dt)
\ No newline at end of file
@@ -2,6 +2,8 @@
 Configuration settings for the Telegram Shop Bot.
 """
 import os
+import sys
+from functools import cached_property, lru_cache
 from typing import List, Optional
 from pydantic import BaseSettings, validator
 from pydantic_settings import SettingsConfigDict
@@ -19,6 +21,10 @@ class Settings(BaseSettings):
     # Bot Configuration
     telegram_bot_token: str
     webhook_url: Optional[str] = None
+    webhook_listen: str = "0.0.0.0"
+    webhook_port: int = 8443
+    webhook_path: str = "/webhook/telegram"
+    use_polling: bool = False  # Opt-in for local development only
     
     # Database
     database_url: str = "sqlite:///./shopbot.db"
@@ -88,19 +94,24 @@ class Settings(BaseSettings):
     default_language: str = "en"
     supported_languages: str = "en,lt"
     
+    @validator("default_language")
+    def validate_default_language(cls, v):
+        """Intern the default language code for pointer-equal lookups."""
+        return sys.intern(v)
+
     @validator("supported_languages")
     def validate_languages(cls, v):
-        """Validate and convert supported languages to list."""
+        """Convert supported languages to a frozenset of interned codes."""
         if isinstance(v, str):
-            return [lang.strip() for lang in v.split(",")]
-        return v
-    
+            v = v.split(",")
+        return frozenset(sys.intern(lang.strip()) for lang in v)
+
     @validator("allowed_file_types")
     def validate_file_types(cls, v):
-        """Validate and convert allowed file types to list."""
+        """Convert allowed file types to a frozenset of interned extensions."""
         if isinstance(v, str):
-            return [ext.strip() for ext in v.split(",")]
-        return v
+            v = v.split(",")
+        return frozenset(sys.intern(ext.strip()) for ext in v)
     
     @validator("nowpayments_base_url")
     def set_nowpayments_url(cls, v, values):
@@ -117,16 +128,16 @@ class Settings(BaseSettings):
             raise ValueError("Encryption key must be exactly 32 characters long")
         return v
     
-    @property
+    @cached_property
     def database_url_sync(self) -> str:
-        """Get synchronous database URL."""
+        """Get synchronous database URL (computed once per process)."""
         if self.environment == "development":
             return self.database_url_dev
         return self.database_url
-    
-    @property
+
+    @cached_property
     def database_url_async(self) -> str:
-        """Get asynchronous database URL."""
+        """Get asynchronous database URL (computed once per process)."""
         url = self.database_url_sync
         if url.startswith("postgresql://"):
             return url.replace("postgresql://", "postgresql+asyncpg://", 1)
@@ -135,10 +146,7 @@ class Settings(BaseSettings):
         return url
 
 
-# Global settings instance
-settings = Settings()
-
-
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Get application settings."""
-    return settings
\ No newline at end of file
+    """Get the process-wide settings instance (built on first use)."""
+    return Settings()
\ No newline at end of file
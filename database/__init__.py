@@ -1,12 +1,38 @@
 """
 Database package for the Telegram Shop Bot.
 """
+import enum
+import sys
 
-from .database import get_db, engine, SessionLocal
+from .database import Base, get_db, engine, SessionLocal
 from .models import *
 
 __all__ = [
     "get_db",
-    "engine", 
+    "engine",
     "SessionLocal",
-]
\ No newline at end of file
+]
+
+
+def _intern_model_strings():
+    """
+    Intern every declared column name and enum member value once.
+
+    ORM attribute reads and enum .value comparisons in the message-render
+    hot paths then probe instance dicts with pointer-equal interned keys
+    instead of hashing the strings each time.
+    """
+    from . import models
+
+    for mapper in Base.registry.mappers:
+        for column in mapper.columns:
+            sys.intern(column.key)
+
+    for obj in vars(models).values():
+        if isinstance(obj, type) and issubclass(obj, enum.Enum):
+            for member in obj:
+                if isinstance(member.value, str):
+                    sys.intern(member.value)
+
+
+_intern_model_strings()
\ No newline at end of file
@@ -1,7 +1,9 @@
 """
 Database configuration and connection management.
 """
+import orjson
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
@@ -9,24 +11,85 @@ from config.settings import get_settings
 
 settings = get_settings()
 
-# Create database engine
+
+def _json_serializer(obj) -> str:
+    """Serialize JSON column values with orjson (SQLAlchemy wants str)."""
+    return orjson.dumps(obj).decode()
+
+
+# orjson replaces stdlib json for JSON column round-trips on both engines;
+# it is several times faster and matters most for bulk ActivityLog inserts
+_JSON_ENGINE_KWARGS = dict(
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+)
+
+# Create database engine. Pool sizing (20 + 40 overflow, pre-ping, 30 min
+# recycle) assumes the bot and the in-process web panel share this engine
+# on one event loop/process; processes forked for extra web workers must
+# build their own engine rather than inherit these pooled connections.
 if settings.database_url_sync.startswith("sqlite"):
     engine = create_engine(
         settings.database_url_sync,
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
-        echo=settings.debug
+        echo=settings.debug,
+        **_JSON_ENGINE_KWARGS
     )
 else:
     engine = create_engine(
         settings.database_url_sync,
         pool_size=20,
-        max_overflow=30,
-        echo=settings.debug
+        max_overflow=40,
+        pool_timeout=10,
+        pool_recycle=1800,
+        pool_pre_ping=True,
+        # LIFO checkout keeps a small hot subset of connections in use, so
+        # the server-side statement caches for those connections stay warm
+        pool_use_lifo=True,
+        echo=settings.debug,
+        # Page bulk INSERTs through insertmanyvalues and psycopg2's batch
+        # helpers so high-volume writers (activity/analytics) cost
+        # ceil(N/page) round-trips instead of N
+        insertmanyvalues_page_size=1000,
+        executemany_mode="values_plus_batch",
+        **_JSON_ENGINE_KWARGS
+    )
+
+# Create async database engine (used by the bot's asyncio handlers)
+if settings.database_url_async.startswith("sqlite"):
+    async_engine = create_async_engine(
+        settings.database_url_async,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        echo=settings.debug,
+        **_JSON_ENGINE_KWARGS
+    )
+else:
+    async_engine = create_async_engine(
+        settings.database_url_async,
+        pool_size=20,
+        max_overflow=40,
+        pool_timeout=10,
+        pool_recycle=1800,
+        pool_pre_ping=True,
+        pool_use_lifo=True,
+        echo=settings.debug,
+        insertmanyvalues_page_size=1000,
+        **_JSON_ENGINE_KWARGS
     )
 
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create SessionLocal class. expire_on_commit=False matches the async
+# factory: rows returned to handlers stay readable after commit instead of
+# re-issuing a SELECT per attribute access.
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
+
+# Create async session factory
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
 
 # Create Base class for models
 Base = declarative_base()
@@ -43,6 +106,14 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """
+    Get async database session.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
     """
     Initialize database tables.
@@ -50,6 +121,9 @@ def init_db():
     import database.models  # Import all models
     Base.metadata.create_all(bind=engine)
 
+    from services.analytics import create_sales_view
+    create_sales_view()
+
 
 def reset_db():
     """
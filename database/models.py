@@ -6,11 +6,33 @@ from sqlalchemy import (
     Column, Integer, String, Float, Boolean, DateTime, Text, 
     ForeignKey, JSON, Enum, UniqueConstraint, Index
 )
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from enum import Enum as PyEnum
 from database.database import Base
 
+# JSON columns are stored as JSONB on Postgres (binary format, indexable
+# with GIN for @> containment queries) and plain JSON elsewhere
+JSONVariant = JSON().with_variant(JSONB(), "postgresql")
+
+
+def StatusEnum(enum_cls, name):
+    """
+    Enum column type persisting member values as a named native type.
+
+    On Postgres this creates a 4-byte ENUM oid instead of a VARCHAR per
+    row and index entry; values_callable stores the lowercase .value
+    strings the application compares against rather than member names.
+    """
+    return Enum(
+        enum_cls,
+        name=name,
+        native_enum=True,
+        values_callable=lambda cls: [member.value for member in cls],
+    )
+
 
 # Enums
 class UserRole(PyEnum):
@@ -72,7 +94,7 @@ class User(Base):
     last_name = Column(String)
     email = Column(String, unique=True, index=True)
     phone = Column(String)
-    role = Column(Enum(UserRole), default=UserRole.CUSTOMER)
+    role = Column(StatusEnum(UserRole, "user_role"), default=UserRole.CUSTOMER)
     language = Column(String, default="en")
     is_active = Column(Boolean, default=True)
     is_verified = Column(Boolean, default=False)
@@ -96,10 +118,16 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
-    # Relationships
+    # Relationships. Order-side relationships eager-load (see Order);
+    # User.orders stays lazy because user lookups (login, the admin user
+    # list, get_or_create_user) never read it — queries that do want the
+    # graph opt in with selectinload(User.orders).
     orders = relationship("Order", back_populates="user")
     tickets = relationship("SupportTicket", back_populates="user")
-    referrals = relationship("User", remote_side=[id])
+    # Self-join: remote_side belongs on the many-to-one (referred_by) side
+    # only. Referral lists are rarely shown, so they stay unloaded unless a
+    # query opts in with selectinload(User.referrals).
+    referrals = relationship("User", back_populates="referred_by", lazy="noload")
     referred_by = relationship("User", remote_side=[id], back_populates="referrals")
 
 
@@ -126,7 +154,9 @@ class Category(Base):
     
     # Relationships
     products = relationship("Product", back_populates="category")
-    subcategories = relationship("Category", remote_side=[id])
+    # Category trees are almost always rendered whole, so children batch-load
+    # with one IN query per level instead of one SELECT per node
+    subcategories = relationship("Category", back_populates="parent", lazy="selectin")
     parent = relationship("Category", remote_side=[id], back_populates="subcategories")
 
 
@@ -144,7 +174,7 @@ class Product(Base):
     # Product details
     sku = Column(String, unique=True, index=True)
     category_id = Column(Integer, ForeignKey("categories.id"))
-    product_type = Column(Enum(ProductType), default=ProductType.DIGITAL)
+    product_type = Column(StatusEnum(ProductType, "product_type"), default=ProductType.DIGITAL)
     is_active = Column(Boolean, default=True)
     is_featured = Column(Boolean, default=False)
     
@@ -167,7 +197,7 @@ class Product(Base):
     requires_shipping = Column(Boolean, default=True)
     
     # Media
-    images = Column(JSON)  # List of image URLs
+    images = Column(JSONVariant)  # List of image URLs
     video_url = Column(String)
     
     # SEO
@@ -203,7 +233,7 @@ class Order(Base):
     user_id = Column(Integer, ForeignKey("users.id"))
     
     # Order details
-    status = Column(Enum(OrderStatus), default=OrderStatus.PENDING)
+    status = Column(StatusEnum(OrderStatus, "order_status"), default=OrderStatus.PENDING)
     subtotal = Column(Float, nullable=False)
     discount_amount = Column(Float, default=0.0)
     tax_amount = Column(Float, default=0.0)
@@ -213,18 +243,23 @@ class Order(Base):
     
     # Payment
     payment_method = Column(String)
-    payment_status = Column(Enum(PaymentStatus), default=PaymentStatus.PENDING)
+    payment_status = Column(StatusEnum(PaymentStatus, "payment_status"), default=PaymentStatus.PENDING)
     
     # Discounts & Promotions
     discount_code = Column(String)
     loyalty_points_used = Column(Integer, default=0)
     
     # Shipping
-    shipping_address = Column(JSON)
-    billing_address = Column(JSON)
+    shipping_address = Column(JSONVariant)
+    billing_address = Column(JSONVariant)
     shipping_method = Column(String)
     tracking_number = Column(String)
     
+    # Denormalized for the admin orders list: the hot "recent orders"
+    # query reads these instead of joining User and OrderItem
+    customer_username = Column(String, index=True)
+    summary_line = Column(String)
+
     # Notes
     customer_notes = Column(Text)
     admin_notes = Column(Text)
@@ -235,15 +270,28 @@ class Order(Base):
     shipped_at = Column(DateTime(timezone=True))
     delivered_at = Column(DateTime(timezone=True))
     
-    # Relationships
+    # Relationships. Items and payments are read whenever an order is
+    # rendered, so both eager-load via selectin to avoid N+1 queries in
+    # order listings.
     user = relationship("User", back_populates="orders")
-    items = relationship("OrderItem", back_populates="order")
-    payments = relationship("Payment", back_populates="order")
+    items = relationship("OrderItem", back_populates="order", lazy="selectin")
+    payments = relationship("Payment", back_populates="order", lazy="selectin")
     
     # Indexes
     __table_args__ = (
         Index('idx_order_user_status', 'user_id', 'status'),
         Index('idx_order_created', 'created_at'),
+        Index('idx_order_created_user', 'created_at', 'customer_username'),
+        # BTREE expression indexes for scalar ->> filters on the shipping
+        # address ("orders to country X / ZIP Y"); a GIN index can't serve
+        # the ->> operator
+        Index('idx_order_ship_country', text("(shipping_address->>'country')")),
+        Index('idx_order_ship_zip', text("(shipping_address->>'zip')")),
+        # Covers the dashboard's "recent orders by status" shape: the
+        # predicate and ORDER BY run on the key, the INCLUDEd columns let
+        # Postgres answer the projection from the index alone
+        Index('idx_order_status_created_desc', 'status', text('created_at DESC'),
+              postgresql_include=['order_number', 'total_amount', 'user_id']),
     )
 
 
@@ -263,10 +311,10 @@ class OrderItem(Base):
     # Product snapshot (in case product changes)
     product_name = Column(String, nullable=False)
     product_sku = Column(String)
-    product_data = Column(JSON)  # Full product data at time of order
+    product_data = Column(JSONVariant)  # Full product data at time of order
     
     # Digital delivery
-    download_links = Column(JSON)
+    download_links = Column(JSONVariant)
     download_count = Column(Integer, default=0)
     download_expires_at = Column(DateTime(timezone=True))
     
@@ -275,7 +323,7 @@ class OrderItem(Base):
     
     # Relationships
     order = relationship("Order", back_populates="items")
-    product = relationship("Product", back_populates="order_items")
+    product = relationship("Product", back_populates="order_items", lazy="selectin")
 
 
 class Payment(Base):
@@ -287,7 +335,7 @@ class Payment(Base):
     
     # NOWPayments fields
     payment_id = Column(String, unique=True, index=True)  # NOWPayments payment ID
-    payment_status = Column(Enum(PaymentStatus), default=PaymentStatus.PENDING)
+    payment_status = Column(StatusEnum(PaymentStatus, "payment_status"), default=PaymentStatus.PENDING)
     pay_address = Column(String)  # Crypto address to pay to
     price_amount = Column(Float, nullable=False)
     price_currency = Column(String, nullable=False)
@@ -321,6 +369,8 @@ class Payment(Base):
     __table_args__ = (
         Index('idx_payment_status', 'payment_status'),
         Index('idx_payment_created', 'created_at'),
+        # Serves the pending-payment expiry sweep without a separate sort
+        Index('idx_payment_expires', 'payment_status', 'expires_at'),
     )
 
 
@@ -350,14 +400,26 @@ class DiscountCode(Base):
     valid_until = Column(DateTime(timezone=True))
     
     # Targeting
-    applies_to_products = Column(JSON)  # List of product IDs
-    applies_to_categories = Column(JSON)  # List of category IDs
+    applies_to_products = Column(JSONVariant)  # List of product IDs
+    applies_to_categories = Column(JSONVariant)  # List of category IDs
     customer_eligibility = Column(String, default="all")  # all, new, existing
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Indexes. jsonb_path_ops GIN indexes accelerate @> containment
+    # ("codes applying to product X") on Postgres; other backends create
+    # plain column indexes.
+    __table_args__ = (
+        Index('idx_discount_products_gin', 'applies_to_products',
+              postgresql_using='gin',
+              postgresql_ops={'applies_to_products': 'jsonb_path_ops'}),
+        Index('idx_discount_categories_gin', 'applies_to_categories',
+              postgresql_using='gin',
+              postgresql_ops={'applies_to_categories': 'jsonb_path_ops'}),
+    )
+
 
 class LoyaltyTransaction(Base):
     """Loyalty points transaction model."""
@@ -387,7 +449,7 @@ class SupportTicket(Base):
     
     # Ticket details
     subject = Column(String, nullable=False)
-    status = Column(Enum(TicketStatus), default=TicketStatus.OPEN)
+    status = Column(StatusEnum(TicketStatus, "ticket_status"), default=TicketStatus.OPEN)
     priority = Column(String, default="normal")  # low, normal, high, urgent
     category = Column(String)
     
@@ -402,7 +464,7 @@ class SupportTicket(Base):
     # Relationships
     user = relationship("User", back_populates="tickets", foreign_keys=[user_id])
     assigned_to = relationship("User", foreign_keys=[assigned_to_id])
-    messages = relationship("SupportMessage", back_populates="ticket")
+    messages = relationship("SupportMessage", back_populates="ticket", lazy="selectin")
 
 
 class SupportMessage(Base):
@@ -416,7 +478,7 @@ class SupportMessage(Base):
     # Message details
     message = Column(Text, nullable=False)
     is_internal = Column(Boolean, default=False)  # Internal notes vs customer messages
-    attachments = Column(JSON)  # List of attachment URLs
+    attachments = Column(JSONVariant)  # List of attachment URLs
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -427,19 +489,21 @@ class SupportMessage(Base):
 
 
 class Analytics(Base):
-    """Analytics data model."""
+    """Ad-hoc analytics metric model (one row per date/type/name)."""
     __tablename__ = "analytics"
-    
+
     id = Column(Integer, primary_key=True, index=True)
     date = Column(DateTime(timezone=True), nullable=False, index=True)
     metric_type = Column(String, nullable=False, index=True)
     metric_name = Column(String, nullable=False)
     value = Column(Float, nullable=False)
-    metadata = Column(JSON)
-    
+    # "metadata" is reserved on declarative classes, so the attribute is
+    # meta while the column keeps its original name
+    meta = Column("metadata", JSONVariant)
+
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    
+
     # Indexes
     __table_args__ = (
         Index('idx_analytics_date_type', 'date', 'metric_type'),
@@ -447,13 +511,40 @@ class Analytics(Base):
     )
 
 
+class DailyStats(Base):
+    """
+    Pre-aggregated daily dashboard metrics, one wide row per day.
+
+    The hot "today's stats" panel reads this single row instead of
+    filtering N Analytics rows per metric; writers keep it current with
+    an INSERT ... ON CONFLICT (date) DO UPDATE. Custom or rarely-read
+    metrics stay in the row-per-metric Analytics table.
+    """
+    __tablename__ = "daily_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    date = Column(DateTime(timezone=True), nullable=False, unique=True, index=True)
+
+    # Hot metrics, inlined as columns
+    orders_count = Column(Integer, default=0)
+    revenue = Column(Float, default=0.0)
+    new_users = Column(Integer, default=0)
+    active_users = Column(Integer, default=0)
+    products_sold = Column(Integer, default=0)
+    support_tickets = Column(Integer, default=0)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
 class BackupLog(Base):
     """Backup operation log model."""
     __tablename__ = "backup_logs"
     
     id = Column(Integer, primary_key=True, index=True)
     backup_type = Column(String, nullable=False)  # full, incremental, manual
-    status = Column(Enum(BackupStatus), default=BackupStatus.PENDING)
+    status = Column(StatusEnum(BackupStatus, "backup_status"), default=BackupStatus.PENDING)
     file_path = Column(String)
     file_size = Column(Integer)
     
@@ -461,7 +552,7 @@ class BackupLog(Base):
     started_at = Column(DateTime(timezone=True))
     completed_at = Column(DateTime(timezone=True))
     error_message = Column(Text)
-    tables_backed_up = Column(JSON)
+    tables_backed_up = Column(JSONVariant)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -492,7 +583,7 @@ class ActivityLog(Base):
     action = Column(String, nullable=False)
     entity_type = Column(String)  # product, order, user, etc.
     entity_id = Column(String)
-    details = Column(JSON)
+    details = Column(JSONVariant)
     ip_address = Column(String)
     user_agent = Column(String)
     
@@ -504,6 +595,11 @@ class ActivityLog(Base):
     
     # Indexes
     __table_args__ = (
-        Index('idx_activity_user_created', 'user_id', 'created_at'),
+        # DESC matches the "last N actions" access pattern, so recent-first
+        # LIMIT queries walk the index forward instead of backwards
+        Index('idx_activity_user_created_desc', 'user_id', text('created_at DESC')),
         Index('idx_activity_entity', 'entity_type', 'entity_id'),
+        Index('idx_activity_details_gin', 'details',
+              postgresql_using='gin',
+              postgresql_ops={'details': 'jsonb_path_ops'}),
     )
\ No newline at end of file
@@ -0,0 +1,47 @@
+"""
+Query-counting helpers for catching N+1 regressions.
+
+Wrap a code path in count_queries() and assert on the count afterwards;
+an endpoint that should issue "orders + items selectin + payments
+selectin" can then fail loudly when a loader-strategy change
+reintroduces one SELECT per row:
+
+    with count_queries() as queries:
+        orders_page(...)
+    assert len(queries) <= 3, queries.statements
+"""
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from database.database import engine
+
+
+class QueryLog:
+    """Statements captured while a count_queries() block runs."""
+
+    def __init__(self):
+        self.statements = []
+
+    def __len__(self):
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries(bind=engine):
+    """
+    Record every statement executed on `bind` inside the block.
+
+    Yields a QueryLog; len() gives the query count and .statements the
+    SQL strings for diagnosing which query multiplied.
+    """
+    log = QueryLog()
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        log.statements.append(statement)
+
+    event.listen(bind, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield log
+    finally:
+        event.remove(bind, "before_cursor_execute", _before_cursor_execute)
@@ -0,0 +1,62 @@
+"""
+Single-statement upsert writers for settings and metrics.
+
+A SELECT-then-branch upsert costs two round-trips and races under
+concurrent writers; these helpers issue one atomic
+INSERT ... ON CONFLICT DO UPDATE against the uniqueness the tables
+already declare (SystemSetting.key and the Analytics
+(date, metric_type, metric_name) constraint).
+"""
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.sql import func
+
+from config.settings import get_settings
+from database.models import Analytics, SystemSetting
+
+settings = get_settings()
+
+_dialect_insert = (
+    pg_insert
+    if settings.database_url_sync.startswith("postgresql")
+    else sqlite_insert
+)
+
+
+def record_metric(db, date, metric_type, metric_name, value, meta=None):
+    """
+    Insert a metric row or add `value` onto the existing one.
+
+    The caller owns the transaction and commits.
+    """
+    stmt = _dialect_insert(Analytics).values(
+        date=date,
+        metric_type=metric_type,
+        metric_name=metric_name,
+        value=value,
+        meta=meta,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["date", "metric_type", "metric_name"],
+        set_={"value": Analytics.value + stmt.excluded.value},
+    )
+    db.execute(stmt)
+
+
+def set_system_setting(db, key, value, description=None, category="general"):
+    """
+    Create or update a system setting in one statement.
+
+    The caller owns the transaction and commits.
+    """
+    stmt = _dialect_insert(SystemSetting).values(
+        key=key,
+        value=value,
+        description=description,
+        category=category,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["key"],
+        set_={"value": stmt.excluded.value, "updated_at": func.now()},
+    )
+    db.execute(stmt)
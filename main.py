@@ -7,16 +7,16 @@ handling all initialization and providing a comprehensive 24/7 shop bot solution
 import asyncio
 import signal
 import sys
-import threading
 from pathlib import Path
 
-import uvicorn
 from loguru import logger
 
 from config.settings import get_settings
 from database.database import init_db
-from bot.bot import telegram_bot
-from web.app import app as web_app
+
+# The bot framework and web app are imported lazily inside the methods
+# that need them, so CLI commands (create-admin, setup-db, backup) start
+# in milliseconds instead of loading telegram/fastapi/payment stacks.
 
 settings = get_settings()
 
@@ -49,6 +49,8 @@ class ShopBotApplication:
         self.running = False
         self.web_server = None
         self.bot_task = None
+        self.web_task = None
+        self._stopped = asyncio.Event()
         
     async def start(self):
         """Start the application."""
@@ -78,12 +80,16 @@ class ShopBotApplication:
     
     async def stop(self):
         """Stop the application."""
+        if self._stopped.is_set():
+            return
         try:
             logger.info("🛑 Stopping Telegram Shop Bot Application")
             self.running = False
             
             # Stop bot
             if self.bot_task and not self.bot_task.done():
+                from bot.bot import telegram_bot
+
                 logger.info("🤖 Stopping Telegram bot...")
                 await telegram_bot.stop()
                 self.bot_task.cancel()
@@ -96,11 +102,15 @@ class ShopBotApplication:
             if self.web_server:
                 logger.info("🌐 Stopping web server...")
                 self.web_server.should_exit = True
+                if self.web_task and not self.web_task.done():
+                    await self.web_task
             
             logger.info("✅ Application stopped successfully")
             
         except Exception as e:
             logger.error(f"❌ Error stopping application: {e}")
+        finally:
+            self._stopped.set()
     
     def _create_directories(self):
         """Create necessary directories."""
@@ -130,6 +140,8 @@ class ShopBotApplication:
     
     async def _run_bot(self):
         """Run the Telegram bot."""
+        from bot.bot import telegram_bot
+
         try:
             await telegram_bot.start()
             
@@ -142,58 +154,52 @@ class ShopBotApplication:
             raise
     
     async def _start_web_server(self):
-        """Start the web server."""
+        """Start the web server on the main event loop."""
+        import uvicorn
+        from web.app import app as web_app
+
         try:
-            # Configure uvicorn
+            # Configure uvicorn. The server runs as a task on the bot's
+            # event loop: one loop, one shared DB pool, clean shutdown via
+            # should_exit. (workers= only applies to the uvicorn CLI
+            # launcher and was silently ignored in-process.)
             config = uvicorn.Config(
                 app=web_app,
                 host="0.0.0.0",
                 port=8000,
                 log_level=settings.log_level.lower(),
                 access_log=True,
-                reload=settings.debug,
-                workers=1 if settings.debug else 4
+                reload=settings.debug
             )
-            
+
             self.web_server = uvicorn.Server(config)
-            
-            # Start server in background
-            def run_server():
-                asyncio.run(self.web_server.serve())
-            
-            server_thread = threading.Thread(target=run_server, daemon=True)
-            server_thread.start()
-            
+            self.web_task = asyncio.create_task(self.web_server.serve())
+
             logger.info(f"🌐 Web admin panel available at http://localhost:8000")
-            
+
         except Exception as e:
             logger.error(f"Web server error: {e}")
             raise
     
     async def _run_forever(self):
-        """Keep the application running."""
-        try:
-            while self.running:
-                await asyncio.sleep(1)
-        except KeyboardInterrupt:
-            logger.info("👋 Received shutdown signal")
-        except Exception as e:
-            logger.error(f"Runtime error: {e}")
-        finally:
-            await self.stop()
+        """Block until stop() signals shutdown (no polling wakeups)."""
+        await self._stopped.wait()
 
 
 async def main():
     """Main function."""
     app = ShopBotApplication()
     
-    # Handle shutdown signals
-    def signal_handler(signum, frame):
-        logger.info(f"Received signal {signum}")
+    # Handle shutdown signals on the running loop; plain signal.signal
+    # handlers run outside the loop, where create_task is unsafe
+    loop = asyncio.get_running_loop()
+    
+    def signal_handler(sig):
+        logger.info(f"Received signal {sig}")
         asyncio.create_task(app.stop())
     
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, signal_handler, sig)
     
     try:
         await app.start()
@@ -206,6 +212,8 @@ async def main():
 
 def run_development():
     """Run in development mode with auto-reload."""
+    import uvicorn
+
     logger.info("🔧 Starting in development mode")
     
     # Run web server with auto-reload
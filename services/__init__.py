@@ -1,17 +1,28 @@
 """
 Services package for external integrations and business logic.
+
+Service modules are imported lazily (PEP 562) so lightweight entry
+points such as `python main.py setup-db` don't pay for importing the
+payment, QR, or notification stacks they never touch.
 """
+import importlib
+
+_SERVICE_MODULES = {
+    "NOWPaymentsService": ".nowpayments",
+    "QRCodeGenerator": ".qr_generator",
+    "AnalyticsService": ".analytics",
+    "BackupService": ".backup",
+    "NotificationService": ".notifications",
+}
+
+__all__ = list(_SERVICE_MODULES)
 
-from .nowpayments import NOWPaymentsService
-from .qr_generator import QRCodeGenerator
-from .analytics import AnalyticsService
-from .backup import BackupService
-from .notifications import NotificationService
 
-__all__ = [
-    "NOWPaymentsService",
-    "QRCodeGenerator", 
-    "AnalyticsService",
-    "BackupService",
-    "NotificationService",
-]
\ No newline at end of file
+def __getattr__(name):
+    try:
+        module_name = _SERVICE_MODULES[name]
+    except KeyError:
+        raise AttributeError(
+            f"module {__name__!r} has no attribute {name!r}"
+        ) from None
+    return getattr(importlib.import_module(module_name, __name__), name)
@@ -0,0 +1,75 @@
+"""
+Analytics helpers backed by denormalized reporting views.
+
+Revenue-by-category reports otherwise join orders -> order_items ->
+products -> categories and aggregate over every order item on each
+admin dashboard load. The sales_by_category materialized view keeps
+that aggregate precomputed per (category, month) so dashboard reads
+become a single indexed scan; it is refreshed hourly in the background.
+"""
+import asyncio
+
+from loguru import logger
+from sqlalchemy import text
+
+from config.settings import get_settings
+from database.database import engine
+
+settings = get_settings()
+
+SALES_VIEW_REFRESH_INTERVAL = 3600  # seconds between background refreshes
+
+_SALES_BY_CATEGORY_DDL = """
+CREATE MATERIALIZED VIEW IF NOT EXISTS sales_by_category AS
+SELECT
+    c.id AS category_id,
+    date_trunc('month', o.created_at) AS month,
+    sum(oi.total_price) AS total_revenue,
+    count(DISTINCT o.id) AS order_count
+FROM order_items oi
+JOIN orders o ON o.id = oi.order_id
+JOIN products p ON p.id = oi.product_id
+JOIN categories c ON c.id = p.category_id
+WHERE o.status NOT IN ('cancelled', 'refunded')
+GROUP BY c.id, date_trunc('month', o.created_at)
+"""
+
+# The unique index both speeds dashboard lookups and is required for
+# REFRESH ... CONCURRENTLY
+_SALES_BY_CATEGORY_INDEX = """
+CREATE UNIQUE INDEX IF NOT EXISTS idx_sales_by_category
+ON sales_by_category (category_id, month)
+"""
+
+
+def create_sales_view():
+    """Create the sales_by_category materialized view (Postgres only)."""
+    if not settings.database_url_sync.startswith("postgresql"):
+        return
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(_SALES_BY_CATEGORY_DDL))
+            conn.execute(text(_SALES_BY_CATEGORY_INDEX))
+        logger.info("📈 Created sales_by_category materialized view")
+    except Exception as e:
+        logger.error(f"Failed to create sales_by_category view: {e}")
+
+
+def refresh_sales_view():
+    """Refresh sales_by_category without blocking concurrent readers."""
+    if not settings.database_url_sync.startswith("postgresql"):
+        return
+    try:
+        with engine.begin() as conn:
+            conn.execute(
+                text("REFRESH MATERIALIZED VIEW CONCURRENTLY sales_by_category")
+            )
+    except Exception as e:
+        logger.error(f"Failed to refresh sales_by_category view: {e}")
+
+
+async def sales_view_refresh_loop():
+    """Refresh the sales view hourly, off the event loop."""
+    while True:
+        await asyncio.sleep(SALES_VIEW_REFRESH_INTERVAL)
+        await asyncio.to_thread(refresh_sales_view)
@@ -0,0 +1,20 @@
+"""
+Relationship-loading helpers for list-style queries.
+"""
+from sqlalchemy.orm import raiseload, selectinload
+
+
+def eager(*paths):
+    """
+    Build loader options that eager-load the given relationship paths and
+    fail fast on everything else.
+
+    The trailing raiseload("*") turns any lazy load a template sneaks in
+    (e.g. touching order.user.username in a loop) into an immediate
+    exception instead of a silent N+1 query fan-out, so regressions
+    surface in development rather than as slow admin pages.
+
+    Usage:
+        db.query(Order).options(*eager(Order.user, Order.items))
+    """
+    return [selectinload(path) for path in paths] + [raiseload("*")]
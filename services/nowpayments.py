@@ -2,18 +2,23 @@
 NOWPayments API integration service for cryptocurrency payments.
 """
 import asyncio
-import hashlib
 import hmac
 import json
-import uuid
+import secrets
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any
 
 import httpx
+from cachetools import TTLCache
 from loguru import logger
+from sqlalchemy import select, update
+from sqlalchemy.orm import selectinload
 
 from config.settings import get_settings
-from database.models import Payment, PaymentStatus, Order
+from database.database import AsyncSessionLocal
+from database.models import Payment, PaymentStatus, Order, OrderItem, User
 
 settings = get_settings()
 
@@ -24,40 +29,136 @@ class NOWPaymentsService:
     def __init__(self):
         self.api_key = settings.nowpayments_api_key
         self.ipn_secret = settings.nowpayments_ipn_secret
+        self._ipn_secret_bytes = self.ipn_secret.encode("utf-8")
         self.base_url = settings.nowpayments_base_url
         self.timeout = 30
-        
-    async def get_available_currencies(self) -> List[str]:
-        """Get list of available cryptocurrencies."""
+        # api_key never changes after construction, so the header dict is
+        # built once and installed on the shared client
+        self._headers = {
+            "x-api-key": self.api_key,
+            "Content-Type": "application/json",
+            "User-Agent": "TelegramShopBot/1.0"
+        }
+        # One pooled client for all API calls; a fresh AsyncClient per
+        # request paid a TCP + TLS handshake on every round-trip
+        self._client: Optional[httpx.AsyncClient] = None
+        # Available-currencies cache; the list changes rarely but was
+        # fetched over HTTPS on every checkout.
+        self.currencies_cache_ttl = 86400
+        self._currencies_cache: List[str] = []
+        self._currencies_cached_at: float = 0.0
+        # Rates and estimates drift minute-to-minute, so 60s of reuse is
+        # safe and turns repeated checkout lookups into dict hits;
+        # minimum amounts change about as rarely as the currency list.
+        self._rate_cache = TTLCache(maxsize=256, ttl=60)
+        self._estimate_cache = TTLCache(maxsize=512, ttl=60)
+        self._min_amount_cache = TTLCache(maxsize=128, ttl=3600)
+        # Per-key fetch locks so concurrent cache misses coalesce into
+        # one upstream request instead of stampeding the API
+        self._fetch_locks: Dict[Any, asyncio.Lock] = {}
+        self._fetch_lock_refs: Dict[Any, int] = {}
+
+    @asynccontextmanager
+    async def _fetch_lock(self, key):
+        """Hold the lock guarding upstream fetches for a cache key.
+
+        Entries are refcounted and dropped once the last holder leaves,
+        so one-off keys (estimates embed the amount) can't accumulate.
+        """
+        lock = self._fetch_locks.setdefault(key, asyncio.Lock())
+        self._fetch_lock_refs[key] = self._fetch_lock_refs.get(key, 0) + 1
         try:
-            async with httpx.AsyncClient() as client:
+            async with lock:
+                yield
+        finally:
+            refs = self._fetch_lock_refs[key] - 1
+            if refs:
+                self._fetch_lock_refs[key] = refs
+            else:
+                del self._fetch_lock_refs[key]
+                self._fetch_locks.pop(key, None)
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared pooled HTTP client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            # HTTP/2 multiplexes concurrent calls as streams over one
+            # TLS session, so a small keepalive pool is enough
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self._headers,
+                timeout=self.timeout,
+                http2=True,
+                limits=httpx.Limits(
+                    max_keepalive_connections=10,
+                    max_connections=10,
+                    keepalive_expiry=60,
+                ),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the pooled client (called from shutdown hooks and tests)."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+
+    async def __aenter__(self):
+        await self._get_client()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def get_available_currencies(self) -> List[str]:
+        """Get list of available cryptocurrencies (cached with a 24h TTL)."""
+        now = time.monotonic()
+        if self._currencies_cache and now - self._currencies_cached_at < self.currencies_cache_ttl:
+            return self._currencies_cache
+
+        async with self._fetch_lock("currencies"):
+            now = time.monotonic()
+            if self._currencies_cache and now - self._currencies_cached_at < self.currencies_cache_ttl:
+                return self._currencies_cache
+            try:
+                client = await self._get_client()
                 response = await client.get(
-                    f"{self.base_url}/v1/currencies",
-                    headers=self._get_headers(),
-                    timeout=self.timeout
+                    "/v1/currencies",
                 )
                 response.raise_for_status()
                 data = response.json()
-                return data.get("currencies", [])
-        except Exception as e:
-            logger.error(f"Failed to get available currencies: {e}")
-            return []
+                currencies = data.get("currencies", [])
+                if currencies:
+                    self._currencies_cache = currencies
+                    self._currencies_cached_at = now
+                return currencies
+            except Exception as e:
+                logger.error(f"Failed to get available currencies: {e}")
+                # Serve the stale list rather than blocking checkout entirely
+                return self._currencies_cache
     
     async def get_exchange_rate(self, from_currency: str, to_currency: str) -> Optional[float]:
-        """Get exchange rate between two currencies."""
-        try:
-            async with httpx.AsyncClient() as client:
+        """Get exchange rate between two currencies (cached for 60s)."""
+        cache_key = (from_currency.lower(), to_currency.lower())
+        cached = self._rate_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        async with self._fetch_lock(("rate", cache_key)):
+            cached = self._rate_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            try:
+                client = await self._get_client()
                 response = await client.get(
-                    f"{self.base_url}/v1/exchange-amount/{from_currency}_{to_currency}",
-                    headers=self._get_headers(),
-                    timeout=self.timeout
+                    f"/v1/exchange-amount/{from_currency}_{to_currency}",
                 )
                 response.raise_for_status()
                 data = response.json()
-                return float(data.get("exchange_rate", 0))
-        except Exception as e:
-            logger.error(f"Failed to get exchange rate {from_currency} to {to_currency}: {e}")
-            return None
+                rate = float(data.get("exchange_rate", 0))
+                self._rate_cache[cache_key] = rate
+                return rate
+            except Exception as e:
+                logger.error(f"Failed to get exchange rate {from_currency} to {to_currency}: {e}")
+                return None
     
     async def create_payment(
         self,
@@ -67,7 +168,7 @@ class NOWPaymentsService:
     ) -> Optional[Dict[str, Any]]:
         """Create a new payment request."""
         try:
-            purchase_id = f"order_{order.id}_{uuid.uuid4().hex[:8]}"
+            purchase_id = f"order_{order.id}_{secrets.token_hex(4)}"
             
             payment_data = {
                 "price_amount": float(order.total_amount),
@@ -81,19 +182,17 @@ class NOWPaymentsService:
                 "ipn_callback_url": f"{settings.webhook_url}/payment-ipn",
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/v1/payment",
-                    headers=self._get_headers(),
-                    json=payment_data,
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                logger.info(f"Created payment for order {order.order_number}: {data.get('payment_id')}")
-                return data
-                
+            client = await self._get_client()
+            response = await client.post(
+                "/v1/payment",
+                json=payment_data,
+            )
+            response.raise_for_status()
+            data = response.json()
+
+            logger.info(f"Created payment for order {order.order_number}: {data.get('payment_id')}")
+            return data
+
         except Exception as e:
             logger.error(f"Failed to create payment for order {order.order_number}: {e}")
             return None
@@ -101,63 +200,83 @@ class NOWPaymentsService:
     async def get_payment_status(self, payment_id: str) -> Optional[Dict[str, Any]]:
         """Get payment status by payment ID."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/v1/payment/{payment_id}",
-                    headers=self._get_headers(),
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data
+            client = await self._get_client()
+            response = await client.get(
+                f"/v1/payment/{payment_id}",
+            )
+            response.raise_for_status()
+            data = response.json()
+            return data
         except Exception as e:
             logger.error(f"Failed to get payment status for {payment_id}: {e}")
             return None
     
     async def get_minimum_payment_amount(self, currency: str) -> Optional[float]:
-        """Get minimum payment amount for a currency."""
-        try:
-            async with httpx.AsyncClient() as client:
+        """Get minimum payment amount for a currency (cached for 1h)."""
+        cache_key = currency.lower()
+        cached = self._min_amount_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        async with self._fetch_lock(("min_amount", cache_key)):
+            cached = self._min_amount_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            try:
+                client = await self._get_client()
                 response = await client.get(
-                    f"{self.base_url}/v1/min-amount",
-                    headers=self._get_headers(),
+                    "/v1/min-amount",
                     params={"currency_from": "usd", "currency_to": currency.lower()},
-                    timeout=self.timeout
                 )
                 response.raise_for_status()
                 data = response.json()
-                return float(data.get("min_amount", 0))
-        except Exception as e:
-            logger.error(f"Failed to get minimum amount for {currency}: {e}")
-            return None
+                min_amount = float(data.get("min_amount", 0))
+                self._min_amount_cache[cache_key] = min_amount
+                return min_amount
+            except Exception as e:
+                logger.error(f"Failed to get minimum amount for {currency}: {e}")
+                return None
     
     async def verify_ipn_signature(self, payload: str, signature: str) -> bool:
         """Verify IPN signature for security."""
         try:
-            expected_signature = hmac.new(
-                self.ipn_secret.encode('utf-8'),
-                payload.encode('utf-8'),
-                hashlib.sha512
-            ).hexdigest()
-            return hmac.compare_digest(expected_signature, signature)
+            # hmac.digest is the one-shot C fast path; comparing raw bytes
+            # halves the material compare_digest walks while keeping its
+            # constant-time property
+            expected = hmac.digest(
+                self._ipn_secret_bytes, payload.encode('utf-8'), 'sha512'
+            )
+            try:
+                signature_bytes = bytes.fromhex(signature)
+            except ValueError:
+                return False
+            return hmac.compare_digest(expected, signature_bytes)
         except Exception as e:
             logger.error(f"Failed to verify IPN signature: {e}")
             return False
     
+    # Built once at class definition; map_payment_status was reallocating
+    # this dict on every IPN callback
+    _STATUS_MAP = {
+        "waiting": PaymentStatus.WAITING,
+        "confirming": PaymentStatus.CONFIRMING,
+        "confirmed": PaymentStatus.CONFIRMED,
+        "sending": PaymentStatus.SENDING,
+        "partially_paid": PaymentStatus.PARTIALLY_PAID,
+        "finished": PaymentStatus.FINISHED,
+        "failed": PaymentStatus.FAILED,
+        "refunded": PaymentStatus.REFUNDED,
+        "expired": PaymentStatus.EXPIRED,
+    }
+
     def map_payment_status(self, nowpayments_status: str) -> PaymentStatus:
         """Map NOWPayments status to our internal status."""
-        status_mapping = {
-            "waiting": PaymentStatus.WAITING,
-            "confirming": PaymentStatus.CONFIRMING,
-            "confirmed": PaymentStatus.CONFIRMED,
-            "sending": PaymentStatus.SENDING,
-            "partially_paid": PaymentStatus.PARTIALLY_PAID,
-            "finished": PaymentStatus.FINISHED,
-            "failed": PaymentStatus.FAILED,
-            "refunded": PaymentStatus.REFUNDED,
-            "expired": PaymentStatus.EXPIRED,
-        }
-        return status_mapping.get(nowpayments_status.lower(), PaymentStatus.PENDING)
+        # The API sends lowercase tokens, so the common case hits without
+        # normalizing; .lower() only runs for unexpected casing
+        status = self._STATUS_MAP.get(nowpayments_status)
+        if status is not None:
+            return status
+        return self._STATUS_MAP.get(nowpayments_status.lower(), PaymentStatus.PENDING)
     
     async def process_ipn_callback(self, ipn_data: Dict[str, Any]) -> bool:
         """Process incoming IPN callback from NOWPayments."""
@@ -169,56 +288,210 @@ class NOWPaymentsService:
                 logger.warning("Invalid IPN data received")
                 return False
             
-            # Update payment status in database
-            from database.database import SessionLocal
+            new_status = self.map_payment_status(payment_status)
             
-            db = SessionLocal()
-            try:
-                payment = db.query(Payment).filter(
-                    Payment.payment_id == payment_id
-                ).first()
-                
-                if not payment:
-                    logger.warning(f"Payment not found for IPN: {payment_id}")
-                    return False
-                
-                old_status = payment.payment_status
-                new_status = self.map_payment_status(payment_status)
+            # Update payment status on the async session so the event loop
+            # keeps serving other coroutines during the DB round-trips
+            # instead of parking on a sync driver
+            async with AsyncSessionLocal() as db:
+                # Conditional UPDATE: the row comes back only if the status
+                # actually transitioned. NOWPayments retries IPNs, and the
+                # payment_id unique index plus the row lock taken here make
+                # concurrent duplicates no-ops instead of double-awarding
+                # loyalty points.
+                result = await db.execute(
+                    update(Payment)
+                    .where(
+                        Payment.payment_id == payment_id,
+                        Payment.payment_status != new_status,
+                    )
+                    .values(
+                        payment_status=new_status,
+                        actually_paid=float(ipn_data.get("actually_paid", 0)),
+                        actually_paid_currency=ipn_data.get("actually_paid_currency"),
+                        txn_id=ipn_data.get("outcome", {}).get("txid"),
+                        network=ipn_data.get("outcome", {}).get("network"),
+                        updated_at=datetime.now(timezone.utc),
+                    )
+                    .returning(Payment.id, Payment.order_id)
+                )
+                row = result.fetchone()
                 
-                # Update payment details
-                payment.payment_status = new_status
-                payment.actually_paid = float(ipn_data.get("actually_paid", 0))
-                payment.actually_paid_currency = ipn_data.get("actually_paid_currency")
-                payment.txn_id = ipn_data.get("outcome", {}).get("txid")
-                payment.network = ipn_data.get("outcome", {}).get("network")
-                payment.updated_at = datetime.now(timezone.utc)
+                if row is None:
+                    exists = await db.scalar(
+                        select(Payment.id).where(Payment.payment_id == payment_id)
+                    )
+                    if exists is None:
+                        logger.warning(f"Payment not found for IPN: {payment_id}")
+                        return False
+                    # Duplicate or out-of-order IPN; already at this status
+                    logger.info(f"IPN for {payment_id} is a no-op ({payment_status})")
+                    return True
                 
-                # Update order status if payment is finished
-                if new_status == PaymentStatus.FINISHED and old_status != PaymentStatus.FINISHED:
+                # Run order/loyalty/delivery side effects only for the IPN
+                # that actually performed the transition to finished
+                if new_status == PaymentStatus.FINISHED:
                     from database.models import OrderStatus
-                    payment.order.payment_status = PaymentStatus.FINISHED
-                    payment.order.status = OrderStatus.PAID
-                    payment.order.updated_at = datetime.now(timezone.utc)
+                    
+                    # Async sessions cannot lazy-load implicitly, so the
+                    # delivery path's items and products load up front
+                    order = (await db.execute(
+                        select(Order)
+                        .options(
+                            selectinload(Order.items)
+                            .selectinload(OrderItem.product)
+                        )
+                        .where(Order.id == row.order_id)
+                    )).scalar_one()
+                    order.payment_status = PaymentStatus.FINISHED
+                    order.status = OrderStatus.PAID
+                    order.updated_at = datetime.now(timezone.utc)
                     
                     # Award loyalty points
-                    await self._award_loyalty_points(payment.order)
+                    await self._award_loyalty_points(db, order)
                     
                     # Process digital delivery
-                    if payment.order.items:
-                        await self._process_digital_delivery(payment.order)
+                    if order.items:
+                        await self._process_digital_delivery(order)
                 
-                db.commit()
+                await db.commit()
                 
-                logger.info(f"Updated payment {payment_id} status: {old_status} -> {new_status}")
+                logger.info(f"Updated payment {payment_id} status -> {new_status}")
                 return True
                 
-            finally:
-                db.close()
-                
         except Exception as e:
             logger.error(f"Failed to process IPN callback: {e}")
             return False
     
+    # Statuses a background refresh still cares about
+    _PENDING_STATUSES = (
+        PaymentStatus.WAITING,
+        PaymentStatus.CONFIRMING,
+        PaymentStatus.SENDING,
+    )
+
+    def _load_pending_chunk(self, last_id: int, chunk_size: int):
+        """Load the next keyset page of pending payments (sync, threaded)."""
+        from database.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            return (
+                db.query(
+                    Payment.id,
+                    Payment.payment_id,
+                    Payment.payment_status,
+                    Payment.updated_at,
+                )
+                .filter(
+                    Payment.payment_status.in_(self._PENDING_STATUSES),
+                    Payment.id > last_id,
+                )
+                .order_by(Payment.id)
+                .limit(chunk_size)
+                .all()
+            )
+        finally:
+            db.close()
+
+    def _apply_status_updates(self, updates) -> None:
+        """Bulk-write refreshed payment statuses (sync, threaded)."""
+        from database.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            db.bulk_update_mappings(Payment, updates)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def refresh_pending_payments(self, chunk_size: int = 100) -> int:
+        """
+        Bulk-refresh pending payment statuses from payment history.
+
+        One history call per chunk of pending rows replaces N individual
+        get_payment_status round-trips. Pages are keyset-paginated on
+        Payment.id captured before any writes, so rows leaving the
+        pending set mid-pass can't shift later rows past the cursor the
+        way offset pagination did. Non-final status changes are written
+        back with one bulk UPDATE; payments that turned finished go
+        through process_ipn_callback so order/loyalty/delivery side
+        effects run exactly as they would for a real IPN. All sync DB
+        work runs in a worker thread to keep the event loop free.
+
+        Returns the number of payments whose status changed.
+        """
+        changed = 0
+        last_id = 0
+
+        try:
+            while True:
+                pending = await asyncio.to_thread(
+                    self._load_pending_chunk, last_id, chunk_size
+                )
+                if not pending:
+                    break
+                last_id = pending[-1].id
+
+                oldest = min(
+                    (p.updated_at for p in pending if p.updated_at),
+                    default=None,
+                )
+                history = await self.get_payment_history(
+                    limit=chunk_size,
+                    sort_by="updated_at",
+                    date_from=oldest.isoformat() if oldest else None,
+                )
+                remote = {
+                    str(entry.get("payment_id")): entry
+                    for entry in (history or {}).get("data", [])
+                }
+
+                updates = []
+                finished = []
+                for payment in pending:
+                    entry = remote.get(str(payment.payment_id))
+                    if not entry:
+                        continue
+                    new_status = self.map_payment_status(
+                        entry.get("payment_status", "")
+                    )
+                    if new_status == payment.payment_status:
+                        continue
+                    if new_status == PaymentStatus.FINISHED:
+                        finished.append(entry)
+                    else:
+                        updates.append({
+                            "id": payment.id,
+                            "payment_status": new_status,
+                            "actually_paid": float(entry.get("actually_paid", 0) or 0),
+                            "updated_at": datetime.now(timezone.utc),
+                        })
+
+                if updates:
+                    await asyncio.to_thread(self._apply_status_updates, updates)
+                    changed += len(updates)
+
+                for entry in finished:
+                    if await self.process_ipn_callback(entry):
+                        changed += 1
+
+                if len(pending) < chunk_size:
+                    break
+        except Exception as e:
+            logger.error(f"Failed to refresh pending payments: {e}")
+
+        return changed
+
+    async def pending_refresh_loop(self, interval: int = 300) -> None:
+        """Periodically refresh pending payment statuses in the background."""
+        while True:
+            await asyncio.sleep(interval)
+            await self.refresh_pending_payments()
+
     async def create_qr_payment_data(self, payment_data: Dict[str, Any]) -> Dict[str, str]:
         """Create QR code data for payment."""
         try:
@@ -246,10 +519,9 @@ class NOWPaymentsService:
             logger.error(f"Failed to create QR payment data: {e}")
             return {}
     
-    async def _award_loyalty_points(self, order: Order) -> None:
-        """Award loyalty points for completed order."""
+    async def _award_loyalty_points(self, db, order: Order) -> None:
+        """Award loyalty points for a completed order on the caller's session."""
         try:
-            from database.database import SessionLocal
             from database.models import LoyaltyTransaction
             
             # Award 1 point per dollar spent (configurable)
@@ -258,31 +530,31 @@ class NOWPaymentsService:
             if points_earned <= 0:
                 return
             
-            db = SessionLocal()
-            try:
-                # Update user's loyalty points
-                order.user.loyalty_points += points_earned
-                order.user.total_spent += order.total_amount
-                order.user.total_orders += 1
-                
-                # Create loyalty transaction record
-                loyalty_transaction = LoyaltyTransaction(
-                    user_id=order.user_id,
-                    order_id=order.id,
-                    points=points_earned,
-                    type="earned",
-                    description=f"Points earned from order {order.order_number}",
-                    reference=f"order_{order.id}"
+            # Single UPDATE with server-side arithmetic instead of loading
+            # the user row just to read-modify-write three counters
+            await db.execute(
+                update(User)
+                .where(User.id == order.user_id)
+                .values(
+                    loyalty_points=User.loyalty_points + points_earned,
+                    total_spent=User.total_spent + order.total_amount,
+                    total_orders=User.total_orders + 1,
                 )
-                
-                db.add(loyalty_transaction)
-                db.commit()
-                
-                logger.info(f"Awarded {points_earned} loyalty points to user {order.user_id}")
-                
-            finally:
-                db.close()
-                
+            )
+            
+            # Create loyalty transaction record; committed together with
+            # the payment update by the caller
+            db.add(LoyaltyTransaction(
+                user_id=order.user_id,
+                order_id=order.id,
+                points=points_earned,
+                type="earned",
+                description=f"Points earned from order {order.order_number}",
+                reference=f"order_{order.id}"
+            ))
+            
+            logger.info(f"Awarded {points_earned} loyalty points to user {order.user_id}")
+            
         except Exception as e:
             logger.error(f"Failed to award loyalty points: {e}")
     
@@ -300,7 +572,7 @@ class NOWPaymentsService:
                     
                     download_links = []
                     if item.product.digital_file_url:
-                        download_token = uuid.uuid4().hex
+                        download_token = secrets.token_hex(16)
                         download_links.append({
                             "url": f"{settings.webhook_url}/download/{download_token}",
                             "token": download_token,
@@ -311,24 +583,16 @@ class NOWPaymentsService:
                     item.download_links = download_links
                     item.download_expires_at = expiry_date
             
-            from database.database import SessionLocal
-            db = SessionLocal()
-            try:
-                db.commit()
-                logger.info(f"Processed digital delivery for order {order.order_number}")
-            finally:
-                db.close()
+            # Item changes flush with the caller's commit on the session
+            # the order is attached to
+            logger.info(f"Processed digital delivery for order {order.order_number}")
                 
         except Exception as e:
             logger.error(f"Failed to process digital delivery: {e}")
     
     def _get_headers(self) -> Dict[str, str]:
         """Get API headers for NOWPayments requests."""
-        return {
-            "x-api-key": self.api_key,
-            "Content-Type": "application/json",
-            "User-Agent": "TelegramShopBot/1.0"
-        }
+        return self._headers
     
     async def estimate_payment_amount(
         self, 
@@ -336,48 +600,59 @@ class NOWPaymentsService:
         from_currency: str, 
         to_currency: str
     ) -> Optional[Dict[str, Any]]:
-        """Estimate payment amount for currency conversion."""
-        try:
-            async with httpx.AsyncClient() as client:
+        """Estimate payment amount for currency conversion (cached for 60s)."""
+        cache_key = (round(amount, 2), from_currency.lower(), to_currency.lower())
+        cached = self._estimate_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        async with self._fetch_lock(("estimate", cache_key)):
+            cached = self._estimate_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            try:
+                client = await self._get_client()
                 response = await client.get(
-                    f"{self.base_url}/v1/estimate",
-                    headers=self._get_headers(),
+                    "/v1/estimate",
                     params={
                         "amount": amount,
                         "currency_from": from_currency.lower(),
                         "currency_to": to_currency.lower()
                     },
-                    timeout=self.timeout
                 )
                 response.raise_for_status()
-                return response.json()
-        except Exception as e:
-            logger.error(f"Failed to estimate payment amount: {e}")
-            return None
+                estimate = response.json()
+                self._estimate_cache[cache_key] = estimate
+                return estimate
+            except Exception as e:
+                logger.error(f"Failed to estimate payment amount: {e}")
+                return None
     
     async def get_payment_history(
         self, 
         limit: int = 10, 
         page: int = 0,
         sort_by: str = "created_at",
-        order_by: str = "desc"
+        order_by: str = "desc",
+        date_from: Optional[str] = None
     ) -> Optional[Dict[str, Any]]:
         """Get payment history from NOWPayments."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/v1/payment",
-                    headers=self._get_headers(),
-                    params={
-                        "limit": limit,
-                        "page": page,
-                        "sortBy": sort_by,
-                        "orderBy": order_by
-                    },
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                return response.json()
+            params = {
+                "limit": limit,
+                "page": page,
+                "sortBy": sort_by,
+                "orderBy": order_by
+            }
+            if date_from:
+                params["dateFrom"] = date_from
+            client = await self._get_client()
+            response = await client.get(
+                "/v1/payment",
+                params=params,
+            )
+            response.raise_for_status()
+            return response.json()
         except Exception as e:
             logger.error(f"Failed to get payment history: {e}")
             return None
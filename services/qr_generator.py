@@ -2,6 +2,7 @@
 QR Code generation service for payment invoices.
 """
 import base64
+import functools
 import io
 from typing import Optional, Dict, Any
 from PIL import Image, ImageDraw, ImageFont
@@ -9,6 +10,32 @@ import qrcode
 from qrcode.image.pil import PilImage
 from loguru import logger
 
+# Font lookup order: DejaVu ships on virtually every Linux image this bot
+# deploys to; arial.ttf only resolves on Windows dev machines
+_FONT_CANDIDATES = (
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "DejaVuSans.ttf",
+    "arial.ttf",
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_font(size: int):
+    """
+    Load a TrueType font once per size.
+
+    ImageFont.truetype reopens and parses the font file on every call,
+    so each QR render paid disk I/O for the same font; the cache makes
+    it a one-time cost. Falls back to PIL's bitmap font if no TrueType
+    font resolves.
+    """
+    for path in _FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
 
 class QRCodeGenerator:
     """Service for generating QR codes for cryptocurrency payments."""
@@ -17,7 +44,26 @@ class QRCodeGenerator:
         self.default_size = (300, 300)
         self.default_border = 4
         self.default_box_size = 10
-        
+        # Rendered payment QR PNGs keyed by (uri, amount, currency, address).
+        # Retried/refreshed payment screens reuse the cached bytes instead of
+        # re-rendering the same image.
+        self._payment_qr_cache: Dict[tuple, bytes] = {}
+        self._payment_qr_cache_max = 256
+        self._font_large = _load_font(16)
+        self._font_small = _load_font(12)
+
+    @staticmethod
+    def _fit_box_size(qr: qrcode.QRCode, target_width: int) -> int:
+        """
+        Pick the box size that renders at (close to) the target width.
+
+        Rendering the modules at the right pixel size up front replaces
+        the LANCZOS resample over the full output image, which was both
+        the most expensive step and a source of fuzzy module edges.
+        """
+        modules = qr.modules_count + 2 * qr.border
+        return max(1, target_width // modules)
+
     def generate_payment_qr(
         self,
         payment_data: str,
@@ -64,11 +110,18 @@ class QRCodeGenerator:
             qr.add_data(payment_data)
             qr.make(fit=True)
             
-            # Generate QR code image
+            # Generate QR code image at the target size natively
+            qr.box_size = self._fit_box_size(qr, size[0])
             qr_img = qr.make_image(fill_color="black", back_color="white")
             
-            # Convert to PIL Image for editing
-            qr_img = qr_img.convert("RGB")
+            # A 1-bit PNG is ~8x smaller and encodes much faster than RGB,
+            # so only composite paths (logo / text band) get an RGB canvas
+            needs_rgb = bool(logo_path) or (
+                add_payment_info
+                and any([payment_amount, payment_currency, payment_address])
+            )
+            if needs_rgb:
+                qr_img = qr_img.convert("RGB")
             
             # Add logo if provided
             if logo_path:
@@ -80,12 +133,9 @@ class QRCodeGenerator:
                     qr_img, payment_amount, payment_currency, payment_address
                 )
             
-            # Resize to desired size
-            qr_img = qr_img.resize(size, Image.Resampling.LANCZOS)
-            
             # Convert to bytes
             img_buffer = io.BytesIO()
-            qr_img.save(img_buffer, format='PNG', quality=95)
+            qr_img.save(img_buffer, format='PNG', optimize=False, compress_level=1)
             img_buffer.seek(0)
             
             return img_buffer.getvalue()
@@ -136,13 +186,13 @@ class QRCodeGenerator:
             qr.add_data(data)
             qr.make(fit=True)
             
-            # Generate image
+            # Generate image at the target size natively
+            qr.box_size = self._fit_box_size(qr, size[0])
             qr_img = qr.make_image(fill_color="black", back_color="white")
-            qr_img = qr_img.resize(size, Image.Resampling.LANCZOS)
             
             # Convert to bytes
             img_buffer = io.BytesIO()
-            qr_img.save(img_buffer, format='PNG')
+            qr_img.save(img_buffer, format='PNG', optimize=False, compress_level=1)
             img_buffer.seek(0)
             
             return img_buffer.getvalue()
@@ -188,7 +238,8 @@ class QRCodeGenerator:
             qr.add_data(data)
             qr.make(fit=True)
             
-            # Generate with custom colors
+            # Generate with custom colors at the target size natively
+            qr.box_size = self._fit_box_size(qr, size[0])
             qr_img = qr.make_image(
                 fill_color=brand_color,
                 back_color=background_color
@@ -202,12 +253,9 @@ class QRCodeGenerator:
             if brand_text:
                 qr_img = self._add_brand_text(qr_img, brand_text, brand_color)
             
-            # Resize
-            qr_img = qr_img.resize(size, Image.Resampling.LANCZOS)
-            
             # Convert to bytes
             img_buffer = io.BytesIO()
-            qr_img.save(img_buffer, format='PNG', quality=95)
+            qr_img.save(img_buffer, format='PNG', optimize=False, compress_level=1)
             img_buffer.seek(0)
             
             return img_buffer.getvalue()
@@ -265,12 +313,8 @@ class QRCodeGenerator:
             # Draw text
             draw = ImageDraw.Draw(new_img)
             
-            try:
-                font_large = ImageFont.truetype("arial.ttf", 16)
-                font_small = ImageFont.truetype("arial.ttf", 12)
-            except:
-                font_large = ImageFont.load_default()
-                font_small = ImageFont.load_default()
+            font_large = self._font_large
+            font_small = self._font_small
             
             y_offset = qr_height + 10
             
@@ -319,10 +363,7 @@ class QRCodeGenerator:
             # Draw brand text
             draw = ImageDraw.Draw(new_img)
             
-            try:
-                font = ImageFont.truetype("arial.ttf", 18)
-            except:
-                font = ImageFont.load_default()
+            font = _load_font(18)
             
             text_bbox = draw.textbbox((0, 0), brand_text, font=font)
             text_width = text_bbox[2] - text_bbox[0]
@@ -360,17 +401,26 @@ class QRCodeGenerator:
         Returns dict with QR code image, base64, and metadata.
         """
         try:
-            # Generate QR code image
-            qr_bytes = self.generate_payment_qr(
-                payment_data=payment_uri,
-                add_payment_info=True,
-                payment_amount=amount,
-                payment_currency=currency,
-                payment_address=address
-            )
-            
-            if not qr_bytes:
-                return {}
+            # Reuse previously rendered bytes for identical payments
+            cache_key = (payment_uri, amount, currency, address)
+            qr_bytes = self._payment_qr_cache.get(cache_key)
+
+            if qr_bytes is None:
+                # Generate QR code image
+                qr_bytes = self.generate_payment_qr(
+                    payment_data=payment_uri,
+                    add_payment_info=True,
+                    payment_amount=amount,
+                    payment_currency=currency,
+                    payment_address=address
+                )
+
+                if not qr_bytes:
+                    return {}
+
+                if len(self._payment_qr_cache) >= self._payment_qr_cache_max:
+                    self._payment_qr_cache.clear()
+                self._payment_qr_cache[cache_key] = qr_bytes
             
             # Convert to base64 for web display
             qr_base64 = self.qr_to_base64(qr_bytes)
@@ -26,6 +26,7 @@ from database.models import (
     User, Product, Category, Order, Payment, DiscountCode,
     SupportTicket, Analytics, BackupLog, UserRole, OrderStatus, PaymentStatus
 )
+from services.loading import eager
 from services.nowpayments import nowpayments_service
 from services.qr_generator import qr_generator
 from .auth import (
@@ -115,7 +116,9 @@ def create_app() -> FastAPI:
                     Order.status == OrderStatus.PENDING
                 ).count()
                 
-                recent_orders = db.query(Order).order_by(
+                recent_orders = db.query(Order).options(
+                    *eager(Order.user, Order.items, Order.payments)
+                ).order_by(
                     Order.created_at.desc()
                 ).limit(10).all()
                 
@@ -289,8 +292,11 @@ def create_app() -> FastAPI:
             
             db = SessionLocal()
             try:
-                # Build query
-                query = db.query(Order).join(User)
+                # Build query; eager-load what the table renders and raise
+                # on any other lazy access
+                query = db.query(Order).join(User).options(
+                    *eager(Order.user, Order.items, Order.payments)
+                )
                 
                 if status_filter:
                     query = query.filter(Order.status == status_filter)